@@ -1,18 +1,39 @@
-from flask import Flask, render_template, jsonify
-from flask_socketio import SocketIO
-import requests
+from flask import Flask, render_template, jsonify, request, Response
+from flask_socketio import SocketIO, emit, join_room, leave_room
+import re
 import json
+import copy
+import gzip
+import functools
+import hashlib
+from collections import deque, namedtuple
 from datetime import datetime
 import os
 from dotenv import load_dotenv
-import threading
+import tempfile
 import time
 import logging
 from pycoingecko import CoinGeckoAPI
-import ccxt
+import msgpack
+import http_client
+from cache import provider_cache
+from snapshot_store import LeaderLock, SnapshotStore, atomic_write
+from history import HistoryStore
+from streaming import TickerStream
+import ingestion
+from scheduler import Scheduler
+from market_sync import MarketTable, MarketSync
+from coin_index import NUMERIC_FIELDS, TEXT_FIELDS
+from metrics import registry
+from detection import DetectionEngine, VolumeZScore, VWAPDivergence, enabled_detectors, sinks_from_env
 import eventlet
 eventlet.monkey_patch()
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -40,23 +61,131 @@ socketio = SocketIO(
     max_http_buffer_size=1e8
 )
 
-# Initialize API clients with rate limiting
+# Initialize API clients with rate limiting, all sharing one pooled HTTP session
 cg = CoinGeckoAPI()
-binance = ccxt.binance({
-    'enableRateLimit': True,
-    'options': {
-        'defaultType': 'spot'
-    }
-})
+cg.session = http_client.session
+cg.request_timeout = http_client.DEFAULT_TIMEOUT
+binance = ingestion.create_exchange()
+
+# Upstream endpoints, overridable to point at local stand-ins (see tools/)
+if os.getenv('COINGECKO_API_URL'):
+    cg.api_base_url = os.getenv('COINGECKO_API_URL').rstrip('/') + '/'
 
 # Solana API endpoints
 SOLANA_APIS = {
-    'solanafn': "https://api.solanafn.com/v1",
-    'solscan': "https://public-api.solscan.io",
-    'solana': "https://api.mainnet-beta.solana.com",
-    'coingecko': "https://api.coingecko.com/api/v3"
+    'solanafn': os.getenv('SOLANAFN_API_URL', "https://api.solanafn.com/v1"),
+    'solscan': os.getenv('SOLSCAN_API_URL', "https://public-api.solscan.io"),
+    'solana': os.getenv('SOLANA_RPC_URL', "https://api.mainnet-beta.solana.com"),
+    'coingecko': os.getenv('COINGECKO_API_URL', "https://api.coingecko.com/api/v3")
+}
+
+# Cache lifetimes (fresh ttl, extra seconds a stale value may be served) per provider
+CACHE_TTLS = {
+    'solanafn': (15, 60),
+    'solscan': (60, 300),
+    'binance': (10, 30),
+    'coingecko': (60, 240)
+}
+
+# Refresh cadence (seconds) per data class
+UPDATE_INTERVALS = {
+    'solana': float(os.getenv('SOL_UPDATE_INTERVAL', 15)),
+    'btc': float(os.getenv('BTC_UPDATE_INTERVAL', 15)),
+    'markets': float(os.getenv('MARKET_SYNC_INTERVAL', 30))
+}
+
+# Per-source deadlines (seconds) for the concurrent fetch stage
+SOURCE_DEADLINES = {
+    'solanafn': float(os.getenv('SOLANAFN_DEADLINE', 8)),
+    'solscan': float(os.getenv('SOLSCAN_DEADLINE', 8)),
+    'binance': float(os.getenv('BINANCE_DEADLINE', 8)),
+    'coingecko': float(os.getenv('COINGECKO_DEADLINE', 12))
 }
 
+# Green thread pool shared by all source fetches
+fetch_pool = eventlet.GreenPool(size=int(os.getenv('FETCH_POOL_SIZE', 16)))
+
+# Snapshot file shared by all workers; only the leader holding the lock fetches upstream
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', os.path.join(tempfile.gettempdir(), 'crypto_tracker_snapshot.json'))
+LEADER_LOCK_PATH = os.getenv('LEADER_LOCK_PATH', SNAPSHOT_PATH + '.lock')
+SNAPSHOT_POLL_INTERVAL = float(os.getenv('SNAPSHOT_POLL_INTERVAL', 1))
+snapshot_store = SnapshotStore(SNAPSHOT_PATH)
+leader_lock = LeaderLock(LEADER_LOCK_PATH)
+
+# Market table covering the top MARKET_UNIVERSE coins, synced a few CoinGecko pages per cycle
+MARKET_UNIVERSE = int(os.getenv('MARKET_UNIVERSE', 1000))
+MARKET_PAGE_SIZE = 250  # CoinGecko's maximum per_page
+MARKET_PAGES_PER_CYCLE = int(os.getenv('MARKET_PAGES_PER_CYCLE', 1))
+COINS_MAX_PER_PAGE = 250
+market_table = MarketTable()
+markets_store = SnapshotStore(os.getenv('MARKETS_SNAPSHOT_PATH', SNAPSHOT_PATH + '.markets'))
+
+# Warm-start checkpoint of the served data and market table, kept on persistent disk
+CHECKPOINT_PATH = os.getenv('CHECKPOINT_PATH', 'data/checkpoint.json')
+CHECKPOINT_INTERVAL = float(os.getenv('CHECKPOINT_INTERVAL', 30))
+
+# On-disk history of every sample the fetchers collect
+history = HistoryStore(
+    os.getenv('HISTORY_PATH', 'data/history'),
+    flush_interval=float(os.getenv('HISTORY_FLUSH_INTERVAL', 60)),
+    retention_days=int(os.getenv('HISTORY_RETENTION_DAYS', 365))
+)
+HISTORY_COMPACT_INTERVAL = 24 * 60 * 60
+last_compaction = time.time()
+
+# Last recorded fetch time per series, so cached values aren't recorded twice
+history_marks = {}
+
+# Alerts are raised by the leader only, so it shares the recent ones with the followers
+# through a file, as it does the snapshot, for them to emit to their own clients
+alerts_store = SnapshotStore(os.getenv('ALERTS_SNAPSHOT_PATH', SNAPSHOT_PATH + '.alerts'))
+recent_alerts = deque(maxlen=50)
+# Alerts raised before this worker started are not replayed
+last_alert_id = time.time_ns()
+
+def emit_alert(event, payload):
+    """Emit an alert to this worker's clients and, on the leader, publish it to the followers"""
+    socketio.emit(event, payload, namespace='/')
+    if leader_lock.is_leader:
+        recent_alerts.append({'id': time.time_ns(), 'event': event, 'payload': payload})
+        alerts_store.publish(json.dumps(list(recent_alerts), separators=(',', ':')).encode('utf-8'))
+
+def follow_alerts():
+    """Emit the alerts the leader published since the last read to this worker's clients"""
+    global last_alert_id
+    alerts = alerts_store.read_if_changed()
+    if not alerts:
+        return
+    for alert in alerts:
+        if alert['id'] > last_alert_id:
+            socketio.emit(alert['event'], alert['payload'], namespace='/')
+    last_alert_id = max(last_alert_id, alerts[-1]['id'])
+
+# Streaming detectors run on every recorded sample; ALERT_SINKS=socketio also emits 'alert' events
+EWMA_ALPHA = float(os.getenv('EWMA_ALPHA', 0.1))
+detection = DetectionEngine(enabled_detectors([
+    VolumeZScore(alpha=EWMA_ALPHA, threshold=float(os.getenv('VOLUME_ZSCORE_THRESHOLD', 3))),
+    VWAPDivergence(alpha=EWMA_ALPHA, threshold=float(os.getenv('VWAP_DIVERGENCE_THRESHOLD', 5)))
+]), sinks_from_env(emit_alert))
+
+# Streaming mode: Binance websocket tickers, with REST polling kept as fallback
+STREAMING_MODE = os.getenv('STREAMING_MODE', 'false').lower() == 'true'
+STREAM_EMIT_INTERVAL = float(os.getenv('STREAM_EMIT_INTERVAL', 0.25))
+# Ticks patch the sol/btc rooms straight away; the full snapshot they change is re-encoded
+# for /api/data and written out for the followers on slower cadences of their own
+STREAM_SNAPSHOT_INTERVAL = float(os.getenv('STREAM_SNAPSHOT_INTERVAL', 1))
+STREAM_PUBLISH_INTERVAL = float(os.getenv('STREAM_PUBLISH_INTERVAL', 5))
+STREAM_SYMBOLS = {'SOL/USDT': 'solana_token', 'BTC/USDT': 'btc'}
+# History series (and detector subject) of each streamed symbol
+STREAM_SERIES = {'SOL/USDT': 'sol', 'BTC/USDT': 'btc'}
+# Room carrying each streamed asset
+STREAM_ROOMS = {'sol': 'solana_token', 'btc': 'btc'}
+ticker_stream = None
+stream_dirty = False
+
+# Shared ingestion: Binance tickers come from one core shared with the tracker (see ingestion.py)
+SHARED_INGESTION = os.getenv('INGESTION_MODE', 'off').lower() == 'shared'
+
 # Global data storage with default values
 crypto_data = {
     'solana_token': {
@@ -64,6 +193,8 @@ crypto_data = {
         'volume_24h': 0,
         'market_cap': 0,
         'last_update': None,
+        'source': None,
+        'stale': False,
         'name': 'Solana',
         'symbol': 'SOL',
         'change_24h': 0,
@@ -80,16 +211,48 @@ crypto_data = {
         'volume_24h': 0,
         'market_cap': 0,
         'change_24h': 0,
-        'last_update': None
+        'last_update': None,
+        'source': None,
+        'stale': False
     },
-    'top_100': []
+    'top_100': [],
+    # Whether the top 100 still comes from a checkpoint restored at startup
+    'top_100_status': {
+        'stale': False
+    }
 }
 
+# Hot-path instrumentation, served in the Prometheus text format at /metrics
+FETCH_DURATION = registry.histogram('crypto_fetch_duration_seconds', 'Upstream fetch latency', ['provider'])
+FETCH_RESULTS = registry.counter('crypto_fetch_total', 'Upstream fetches by provider and result', ['provider', 'result'])
+ASSET_SOURCES = registry.counter('crypto_asset_updates_total', 'Asset updates by the source that supplied them', ['asset', 'source'])
+UPDATE_DURATION = registry.histogram('crypto_update_job_duration_seconds', 'Update cycle latency', ['job'])
+SERIALIZE_DURATION = registry.histogram('crypto_serialize_duration_seconds', 'Snapshot encoding latency')
+EMIT_DURATION = registry.histogram('crypto_emit_duration_seconds', 'Socket.IO emit latency', ['event'])
+EMITS = registry.counter('crypto_emits_total', 'Socket.IO broadcasts', ['event'])
+CONNECTED_CLIENTS = registry.gauge('crypto_connected_clients', 'Connected Socket.IO clients')
+ALERTS = registry.counter('crypto_alerts_total', 'Alerts raised by the streaming detectors', ['detector'])
+
+def instrumented(provider):
+    """Record the latency and outcome of every upstream call a fetcher makes"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            with FETCH_DURATION.time(provider=provider):
+                result = func(*args)
+            FETCH_RESULTS.inc(provider=provider, result='success' if result else 'failure')
+            return result
+        return wrapper
+    return decorator
+
+
+@provider_cache.cached(*CACHE_TTLS['solanafn'])
+@instrumented('solanafn')
 def fetch_from_solanafn():
     """Fetch Solana data from SolanaFN API"""
     try:
         logging.info("Attempting to fetch Solana data from SolanaFN API...")
-        response = requests.get(f"{SOLANA_APIS['solanafn']}/price")
+        response = http_client.session.get(f"{SOLANA_APIS['solanafn']}/price")
         if response.status_code == 200:
             data = response.json()
             logging.info(f"Successfully fetched Solana data from SolanaFN: {data}")
@@ -104,11 +267,13 @@ def fetch_from_solanafn():
         logging.error(f"Error fetching from SolanaFN API: {str(e)}")
         return None
 
+@provider_cache.cached(*CACHE_TTLS['solscan'])
+@instrumented('solscan')
 def fetch_from_solscan():
     """Fetch Solana network stats from Solscan API"""
     try:
         logging.info("Attempting to fetch Solana network stats from Solscan...")
-        response = requests.get(f"{SOLANA_APIS['solscan']}/chain/stat")
+        response = http_client.session.get(f"{SOLANA_APIS['solscan']}/chain/stat")
         if response.status_code == 200:
             data = response.json()
             logging.info(f"Successfully fetched Solana network stats from Solscan: {data}")
@@ -124,6 +289,8 @@ def fetch_from_solscan():
         logging.error(f"Error fetching from Solscan API: {str(e)}")
         return None
 
+@provider_cache.cached(*CACHE_TTLS['binance'])
+@instrumented('binance')
 def fetch_from_binance(symbol):
     try:
         logging.info(f"Attempting to fetch {symbol} from Binance...")
@@ -138,6 +305,8 @@ def fetch_from_binance(symbol):
         logging.error(f"Error fetching {symbol} from Binance: {str(e)}")
         return None
 
+@provider_cache.cached(*CACHE_TTLS['coingecko'])
+@instrumented('coingecko')
 def fetch_from_coingecko(symbol):
     try:
         logging.info(f"Attempting to fetch {symbol} from CoinGecko...")
@@ -152,79 +321,161 @@ def fetch_from_coingecko(symbol):
         logging.error(f"Error fetching {symbol} from CoinGecko: {str(e)}")
         return None
 
-def fetch_top_100_coins():
+def fetched_at(fetcher, *args):
+    """When a cached provider response was actually fetched, stable across reuses"""
+    fetched_time = fetcher.fetched_time(*args)
+    return datetime.fromtimestamp(fetched_time).isoformat() if fetched_time else datetime.now().isoformat()
+
+def fetch_with_deadline(source, func, *args):
+    """Run a source fetcher, giving up once the source's deadline passes"""
+    deadline = SOURCE_DEADLINES.get(source)
     try:
-        # Try CoinGecko first
-        coins = cg.get_coins_markets(vs_currency='usd', order='market_cap_desc', per_page=100, sparkline=False)
-        
-        # Format the data
-        formatted_coins = []
-        for coin in coins:
-            formatted_coins.append({
-                'id': coin['id'],
-                'symbol': coin['symbol'].upper(),
-                'name': coin['name'],
-                'image': coin['image'],
-                'current_price': coin['current_price'],
-                'market_cap': coin['market_cap'],
-                'market_cap_rank': coin['market_cap_rank'],
-                'price_change_percentage_24h': coin['price_change_percentage_24h'],
-                'total_volume': coin['total_volume']
-            })
-        
-        crypto_data['top_100'] = formatted_coins
+        with eventlet.Timeout(deadline):
+            return func(*args)
+    except eventlet.Timeout:
+        logging.error(f"Timed out fetching from {source} after {deadline}s")
+        return None
+
+def spawn_fetch(source, func, *args):
+    """Start a source fetch on the shared pool and return its green thread"""
+    return fetch_pool.spawn(fetch_with_deadline, source, func, *args)
+
+@instrumented('coingecko')
+def fetch_from_coingecko_markets(page):
+    # Not cached: the market table already remembers every page and when it was synced
+    try:
+        logging.info(f"Attempting to fetch market page {page} from CoinGecko...")
+        return cg.get_coins_markets(
+            vs_currency='usd',
+            order='market_cap_desc',
+            per_page=MARKET_PAGE_SIZE,
+            page=page,
+            sparkline=False
+        )
+    except Exception as e:
+        logging.error(f"Error fetching coin markets page {page} from CoinGecko: {str(e)}")
+        return None
+
+market_sync = MarketSync(
+    fetch_from_coingecko_markets,
+    market_table,
+    universe=MARKET_UNIVERSE,
+    page_size=MARKET_PAGE_SIZE,
+    pages_per_cycle=MARKET_PAGES_PER_CYCLE
+)
+
+def sync_markets():
+    """Sync the most urgent market pages, then derive the top 100 from the table"""
+    try:
+        if not market_sync.sync_cycle():
+            # Keep existing data if there's an error
+            return
+        if leader_lock.is_leader:
+            markets_store.publish(json.dumps(market_table.dump(), separators=(',', ':')).encode('utf-8'))
+        crypto_data['top_100'] = market_table.top(100)
+        crypto_data['top_100_status'] = {'stale': market_table.stale}
         logging.info("Updated top 100 coins data")
     except Exception as e:
-        logging.error(f"Error fetching top 100 coins: {str(e)}")
+        logging.error(f"Error syncing markets: {str(e)}")
         # Keep existing data if there's an error
 
+def streamed_ticker(symbol):
+    """Fresh ticker for a symbol from the websocket stream or shared ingestion feed, if any"""
+    return ticker_stream.latest(f"{symbol}/USDT") if ticker_stream else None
+
+def merge_ticker(asset, ticker, last_update, source):
+    asset.update({
+        'price': ticker['price'],
+        'volume_24h': ticker['volume_24h'],
+        'change_24h': ticker['change_24h'],
+        'last_update': last_update,
+        'source': source,
+        'stale': False
+    })
+
+def merge_binance(asset_key, symbol, binance_job=None):
+    """Merge the freshest Binance data for an asset and return its source, or None.
+
+    A fresh streamed tick skips REST entirely, and a REST ticker never
+    overwrites streamed ticks newer than it.
+    """
+    asset = crypto_data[asset_key]
+    streamed = streamed_ticker(symbol)
+    if streamed:
+        if binance_job:
+            binance_job.kill()
+        # handle_stream_ticker keeps merging ticks, unless another source had priority until now
+        if asset.get('source') != 'binance_stream':
+            merge_ticker(asset, streamed, datetime.now().isoformat(), 'binance_stream')
+        return 'binance_stream'
+    binance_data = binance_job.wait() if binance_job else fetch_with_deadline('binance', fetch_from_binance, symbol)
+    if not binance_data:
+        return None
+    fetched = fetched_at(fetch_from_binance, symbol)
+    if asset.get('source') == 'binance_stream' and (asset.get('last_update') or '') >= fetched:
+        return 'binance_stream'
+    merge_ticker(asset, binance_data, fetched, 'binance')
+    logging.info(f"Updated {asset_key} data from Binance: {binance_data}")
+    return 'binance'
+
 def fetch_solana_token_data():
     """Fetch token data from multiple sources"""
     try:
         logging.info("Starting Solana data fetch...")
-        
-        # Try SolanaFN API first
-        solanafn_data = fetch_from_solanafn()
+
+        # Query all independent sources at once
+        solanafn_job = spawn_fetch('solanafn', fetch_from_solanafn)
+        solscan_job = spawn_fetch('solscan', fetch_from_solscan)
+        binance_job = None if streamed_ticker('SOL') else spawn_fetch('binance', fetch_from_binance, 'SOL')
+
+        # SolanaFN has priority for price data
+        solanafn_data = solanafn_job.wait()
         if solanafn_data:
             crypto_data['solana_token'].update({
                 'price': solanafn_data['price'],
                 'volume_24h': solanafn_data['volume_24h'],
                 'market_cap': solanafn_data['market_cap'],
                 'change_24h': solanafn_data['change_24h'],
-                'last_update': datetime.now().isoformat()
+                'last_update': fetched_at(fetch_from_solanafn),
+                'source': 'solanafn',
+                'stale': False
             })
+            ASSET_SOURCES.inc(asset='solana_token', source='solanafn')
             logging.info(f"Updated Solana data from SolanaFN: {solanafn_data}")
-
-        # Fetch network stats from Solscan
-        solscan_data = fetch_from_solscan()
-        if solscan_data:
-            crypto_data['solana_token']['network_stats'].update(solscan_data)
-            logging.info(f"Updated Solana network stats from Solscan: {solscan_data}")
-
-        # Try Binance as backup for price data
-        binance_data = fetch_from_binance('SOL')
-        if binance_data and not solanafn_data:
-            crypto_data['solana_token'].update({
-                'price': binance_data['price'],
-                'volume_24h': binance_data['volume_24h'],
-                'change_24h': binance_data['change_24h'],
-                'last_update': datetime.now().isoformat()
-            })
-            logging.info(f"Updated Solana data from Binance: {binance_data}")
+            # Binance is only a backup, no need to wait for it
+            if binance_job:
+                binance_job.kill()
+            binance_source = None
+        else:
+            # Try Binance as backup for price data
+            binance_source = merge_binance('solana_token', 'SOL', binance_job)
+            if binance_source:
+                ASSET_SOURCES.inc(asset='solana_token', source=binance_source)
 
         # Fallback to CoinGecko if needed
-        if not solanafn_data and not binance_data:
-            cg_data = fetch_from_coingecko('solana')
+        if not solanafn_data and not binance_source:
+            cg_data = fetch_with_deadline('coingecko', fetch_from_coingecko, 'solana')
             if cg_data:
                 crypto_data['solana_token'].update({
                     'price': cg_data['usd'],
                     'volume_24h': cg_data['usd_24h_vol'],
                     'market_cap': cg_data['usd_market_cap'],
                     'change_24h': cg_data['usd_24h_change'],
-                    'last_update': datetime.now().isoformat()
+                    'last_update': fetched_at(fetch_from_coingecko, 'solana'),
+                    'source': 'coingecko',
+                    'stale': False
                 })
+                ASSET_SOURCES.inc(asset='solana_token', source='coingecko')
                 logging.info(f"Updated Solana data from CoinGecko: {cg_data}")
-            
+            else:
+                ASSET_SOURCES.inc(asset='solana_token', source='none')
+
+        # Fetch network stats from Solscan
+        solscan_data = solscan_job.wait()
+        if solscan_data:
+            crypto_data['solana_token']['network_stats'].update(solscan_data)
+            logging.info(f"Updated Solana network stats from Solscan: {solscan_data}")
+
         return crypto_data['solana_token']
                     
     except Exception as e:
@@ -236,51 +487,501 @@ def fetch_btc_data():
     try:
         logging.info("Starting BTC data fetch...")
         # Try Binance first
-        binance_data = fetch_from_binance('BTC')
-        if binance_data:
-            crypto_data['btc'].update({
-                'price': binance_data['price'],
-                'volume_24h': binance_data['volume_24h'],
-                'change_24h': binance_data['change_24h'],
-                'last_update': datetime.now().isoformat()
-            })
-            logging.info(f"Updated BTC data from Binance: {binance_data}")
+        binance_source = merge_binance('btc', 'BTC')
+        if binance_source:
+            ASSET_SOURCES.inc(asset='btc', source=binance_source)
             return crypto_data['btc']
 
         # Fallback to CoinGecko
-        cg_data = fetch_from_coingecko('btc')
+        cg_data = fetch_with_deadline('coingecko', fetch_from_coingecko, 'btc')
         if cg_data:
             crypto_data['btc'].update({
                 'price': cg_data['usd'],
                 'volume_24h': cg_data['usd_24h_vol'],
                 'market_cap': cg_data['usd_market_cap'],
                 'change_24h': cg_data['usd_24h_change'],
-                'last_update': datetime.now().isoformat()
+                'last_update': fetched_at(fetch_from_coingecko, 'btc'),
+                'source': 'coingecko',
+                'stale': False
             })
+            ASSET_SOURCES.inc(asset='btc', source='coingecko')
             logging.info(f"Updated BTC data from CoinGecko: {cg_data}")
-            
+        else:
+            ASSET_SOURCES.inc(asset='btc', source='none')
+
         return crypto_data['btc']
                     
     except Exception as e:
         logging.error(f"Error fetching BTC data: {str(e)}")
         return crypto_data['btc']
 
+def detect_market(series, timestamp, price, volume):
+    """Run the market detectors on one sample of a series"""
+    alerts = detection.process({
+        'kind': 'market',
+        'subject': series,
+        'timestamp': timestamp,
+        'price': price,
+        'volume': volume
+    })
+    for alert in alerts:
+        ALERTS.inc(detector=alert.detector)
+
+def record_sample(series, fetched, values, detect=True):
+    """Append a sample to the history store unless it was already recorded"""
+    if not fetched or history_marks.get(series) == fetched:
+        return
+    history_marks[series] = fetched
+    timestamp = datetime.fromisoformat(fetched).timestamp()
+    # A fallback source can hand back an older sample than the last one recorded
+    if not history.append(series, values, timestamp):
+        return
+    if detect and values.get('price') and values.get('volume_24h'):
+        detect_market(series, timestamp, values['price'], values['volume_24h'])
+
+def record_history():
+    """Record the samples collected in this cycle"""
+    global last_compaction
+    try:
+        # Streamed prices reach the detectors tick by tick from handle_stream_ticker
+        sol = crypto_data['solana_token']
+        record_sample('sol', sol['last_update'], {
+            'price': sol['price'],
+            'volume_24h': sol['volume_24h'],
+            'market_cap': sol['market_cap'],
+            'change_24h': sol['change_24h']
+        }, detect=sol['source'] != 'binance_stream')
+        # Keyed on the stored fetch time, so a reused cached response is recorded once
+        if fetch_from_solscan.fetched_time() is not None:
+            record_sample('sol_network', fetched_at(fetch_from_solscan), sol['network_stats'])
+
+        btc = crypto_data['btc']
+        record_sample('btc', btc['last_update'], {
+            'price': btc['price'],
+            'volume_24h': btc['volume_24h'],
+            'market_cap': btc['market_cap'],
+            'change_24h': btc['change_24h']
+        }, detect=btc['source'] != 'binance_stream')
+
+        for coin in crypto_data['top_100']:
+            synced_at = market_table.synced_at(coin['id'])
+            if synced_at:
+                record_sample(coin['id'], datetime.fromtimestamp(synced_at).isoformat(), {
+                    'price': coin['current_price'],
+                    'volume_24h': coin['total_volume'],
+                    'market_cap': coin['market_cap'],
+                    'change_24h': coin['price_change_percentage_24h']
+                })
+
+        if time.time() - last_compaction >= HISTORY_COMPACT_INTERVAL:
+            last_compaction = time.time()
+            history.compact()
+    except Exception as e:
+        logging.error(f"Error recording history: {str(e)}")
+
+# Last broadcast snapshot and its version, used to build delta patches
+snapshot_version = 0
+last_broadcast = copy.deepcopy(crypto_data)
+
+# Socket.IO rooms: one per asset plus the top 100 table, whole or by page.
+# Each room carries its own patch version.
+TOP100_PAGE_SIZE = int(os.getenv('TOP100_PAGE_SIZE', 25))
+DEFAULT_ROOMS = ['sol', 'btc', 'top100']
+ROOM_PATTERN = re.compile(r'^(sol|btc|top100|top100:page[1-9][0-9]*)$')
+room_versions = {}
+
+# Opt-in compact top_100 wire format: MessagePack, one array per field, with
+# static metadata (symbol, name, image) sent on subscribe, then for each coin entering the table
+COMPACT_ROOM = 'top100:msgpack'
+COMPACT_FIELDS = {
+    'p': 'current_price',
+    'mc': 'market_cap',
+    'r': 'market_cap_rank',
+    'c24': 'price_change_percentage_24h',
+    'v': 'total_volume'
+}
+
+def diff_fields(old, new):
+    """Fields of new that differ from old, recursing into nested dicts"""
+    changes = {}
+    for key, value in new.items():
+        if isinstance(value, dict) and isinstance(old.get(key), dict):
+            nested = diff_fields(old[key], value)
+            if nested:
+                changes[key] = nested
+        elif key not in old or old[key] != value:
+            changes[key] = value
+    return changes
+
+def diff_coins(old, new):
+    """Per-coin field changes keyed by coin id, plus the new order if it moved"""
+    old_by_id = {coin['id']: coin for coin in old}
+    coins = {}
+    for coin in new:
+        previous = old_by_id.get(coin['id'])
+        fields = diff_fields(previous, coin) if previous else coin
+        if fields:
+            coins[coin['id']] = fields
+
+    patch = {}
+    if coins:
+        patch['coins'] = coins
+    order = [coin['id'] for coin in new]
+    if order != [coin['id'] for coin in old]:
+        patch['order'] = order
+    return patch
+
+def build_patch(old, new):
+    """Changes needed to turn the old snapshot into the new one"""
+    changes = {}
+    for key, value in new.items():
+        if key == 'top_100':
+            patch = diff_coins(old.get(key, []), value)
+        else:
+            patch = diff_fields(old.get(key, {}), value)
+        if patch:
+            changes[key] = patch
+    return changes
+
+# Pre-encoded /api/data response, replaced (never mutated) after each cycle
+EncodedSnapshot = namedtuple('EncodedSnapshot', [
+    'version', 'etag', 'body', 'gzip_body', 'br_body', 'compact_body', 'top100_compact'
+])
+
+def compact_columns(coins):
+    """Columnar top_100: coin ids plus one array per field"""
+    columns = {'ids': [coin['id'] for coin in coins]}
+    for short, field in COMPACT_FIELDS.items():
+        columns[short] = [coin[field] for coin in coins]
+    return columns
+
+def compact_metadata(coins):
+    """Static per-coin metadata keyed by coin id"""
+    return {coin['id']: {'s': coin['symbol'], 'n': coin['name'], 'i': coin['image']} for coin in coins}
+
+def room_slices(data):
+    """The part of a snapshot each room receives, keyed by room name"""
+    coins = data['top_100']
+    status = data['top_100_status']
+    slices = {
+        'sol': {'solana_token': data['solana_token']},
+        'btc': {'btc': data['btc']},
+        'top100': {'top_100': coins, 'top_100_status': status}
+    }
+    for start in range(0, len(coins), TOP100_PAGE_SIZE):
+        page = start // TOP100_PAGE_SIZE + 1
+        slices[f'top100:page{page}'] = {'top_100': coins[start:start + TOP100_PAGE_SIZE], 'top_100_status': status}
+    return slices
+
+def room_snapshot(room):
+    """Full data for one room, tagged with the room's version"""
+    return {
+        'room': room,
+        'version': room_versions.get(room, 0),
+        'data': room_slices(last_broadcast).get(room, {'top_100': []})
+    }
+
+def full_snapshot():
+    """The last broadcast snapshot tagged with its version"""
+    return dict(last_broadcast, version=snapshot_version)
+
+def encode_snapshot(data, version):
+    """Serialize and compress a snapshot once for every /api/data request and compact subscriber"""
+    body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    columns = compact_columns(data['top_100'])
+    compact = dict(data, top_100={'columns': columns, 'meta': compact_metadata(data['top_100'])})
+    return EncodedSnapshot(
+        version=version,
+        etag=hashlib.sha256(body).hexdigest()[:32],
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=6),
+        br_body=brotli.compress(body) if brotli else None,
+        compact_body=msgpack.packb(compact),
+        top100_compact=msgpack.packb({'version': version, 'columns': columns})
+    )
+
+def publish_snapshot():
+    """Swap in a freshly encoded snapshot of the last broadcast"""
+    global current_snapshot, snapshot_pending
+    with SERIALIZE_DURATION.time():
+        current_snapshot = encode_snapshot(full_snapshot(), snapshot_version)
+    snapshot_pending = False
+
+def store_snapshot():
+    """Write the encoded snapshot to the shared file the followers read, on the leader"""
+    global stored_version
+    if leader_lock.is_leader:
+        snapshot_store.publish(current_snapshot.body)
+    stored_version = current_snapshot.version
+
+current_snapshot = encode_snapshot(full_snapshot(), snapshot_version)
+# Whether streamed patches changed the last broadcast since it was encoded, and the
+# version last written to the snapshot file
+snapshot_pending = False
+stored_version = snapshot_version
+
+def emit_to_room(event, payload, room):
+    """Broadcast an event to a room, timing the emit"""
+    with EMIT_DURATION.time(event=event):
+        socketio.emit(event, payload, to=room, namespace='/')
+    EMITS.inc(event=event)
+
+def emit_room_patches(room_patches):
+    """Emit each room's patch on top of the version its subscribers hold"""
+    for room, patch in room_patches.items():
+        base = room_versions.get(room, 0)
+        room_versions[room] = base + 1
+        emit_to_room('room_patch', {
+            'room': room,
+            'version': base + 1,
+            'base': base,
+            'changes': patch
+        }, room)
+
+def broadcast_update(version=None):
+    """Emit to each room only the coins and fields that changed since the last broadcast"""
+    global snapshot_version, last_broadcast
+    current = copy.deepcopy(crypto_data)
+    changes = build_patch(last_broadcast, current)
+    if not changes:
+        logging.info("No changes to broadcast")
+        return
+
+    # Only rooms whose slice changed get a patch
+    old_slices = room_slices(last_broadcast)
+    new_slices = room_slices(current)
+    room_patches = {}
+    for room in new_slices.keys() | old_slices.keys():
+        patch = build_patch(old_slices.get(room, {}), new_slices.get(room, {'top_100': []}))
+        if patch:
+            room_patches[room] = patch
+
+    previous_ids = {coin['id'] for coin in last_broadcast['top_100']}
+    snapshot_version = version if version is not None else snapshot_version + 1
+    last_broadcast = current
+    publish_snapshot()
+    store_snapshot()
+    emit_room_patches(room_patches)
+
+    if 'top100' in room_patches:
+        # Subscribers have metadata for the previous table, so only coins entering it need theirs
+        new_coins = [coin for coin in current['top_100'] if coin['id'] not in previous_ids]
+        if new_coins:
+            emit_to_room('top100_meta', msgpack.packb(compact_metadata(new_coins)), COMPACT_ROOM)
+        emit_to_room('top100_compact', current_snapshot.top100_compact, COMPACT_ROOM)
+    logging.info(f"Emitted snapshot v{snapshot_version} patches to rooms: {sorted(room_patches)}")
+
+def handle_stream_ticker(symbol, ticker):
+    """Merge a streamed ticker into crypto_data and run the detectors on it;
+    emit_stream_updates broadcasts it"""
+    global stream_dirty
+    asset = crypto_data[STREAM_SYMBOLS[symbol]]
+    # SolanaFN keeps priority for SOL while it is healthy
+    if asset.get('source') == 'solanafn':
+        return
+    merge_ticker(asset, ticker, datetime.now().isoformat(), 'binance_stream')
+    stream_dirty = True
+    if ticker['price'] and ticker['volume_24h']:
+        detect_market(STREAM_SERIES[symbol], time.time(), ticker['price'], ticker['volume_24h'])
+
+def broadcast_stream_update():
+    """Patch the sol and btc rooms straight from the streamed assets, leaving the full
+    snapshot to be re-encoded on its own cadence"""
+    global last_broadcast, snapshot_pending
+    room_patches = {}
+    for room, asset in STREAM_ROOMS.items():
+        current = copy.deepcopy(crypto_data[asset])
+        patch = build_patch({asset: last_broadcast[asset]}, {asset: current})
+        if patch:
+            room_patches[room] = patch
+            last_broadcast = dict(last_broadcast, **{asset: current})
+    if room_patches:
+        snapshot_pending = True
+        emit_room_patches(room_patches)
+
+def emit_stream_updates():
+    """Coalesce streamed ticks into at most one room patch per STREAM_EMIT_INTERVAL, then
+    re-encode and write out the snapshot at most once per STREAM_SNAPSHOT_INTERVAL and
+    STREAM_PUBLISH_INTERVAL"""
+    global stream_dirty, snapshot_version
+    last_encode = last_store = 0
+    while True:
+        time.sleep(STREAM_EMIT_INTERVAL)
+        try:
+            if stream_dirty:
+                stream_dirty = False
+                broadcast_stream_update()
+            now = time.monotonic()
+            if snapshot_pending and now - last_encode >= STREAM_SNAPSHOT_INTERVAL:
+                last_encode = now
+                snapshot_version += 1
+                publish_snapshot()
+            if stored_version != current_snapshot.version and now - last_store >= STREAM_PUBLISH_INTERVAL:
+                last_store = now
+                store_snapshot()
+        except Exception as e:
+            logging.error(f"Error emitting streamed update: {str(e)}")
+
+def start_streaming():
+    """Subscribe to exchange ticker streams for every streamed symbol"""
+    global ticker_stream
+    logging.info("Starting ticker streams...")
+    ticker_stream = TickerStream(STREAM_SYMBOLS, on_ticker=handle_stream_ticker).start()
+    socketio.start_background_task(emit_stream_updates)
+
+def start_ingestion():
+    """Take Binance tickers from the shared ingestion core instead of polling them here"""
+    global ticker_stream
+    logging.info("Attaching to the shared ingestion core...")
+    ticker_stream = ingestion.attach(
+        STREAM_SYMBOLS,
+        on_ticker=handle_stream_ticker,
+        exchange=binance,
+        streaming=STREAMING_MODE
+    )
+    socketio.start_background_task(emit_stream_updates)
+
+def run_update_job(name, fetch, *args):
+    """Run one fetch job, then record and broadcast whatever changed"""
+    with app.app_context(), UPDATE_DURATION.time(job=name):
+        fetch(*args)
+        record_history()
+        # Formatting the whole dict is costly, so only do it when someone will read it
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f"Current crypto data: {crypto_data}")
+        broadcast_update()
+
+def throttled(*providers):
+    """Scheduler hook reporting whether any provider rate limited a job's run"""
+    return lambda since: http_client.session.throttled_since(since, *providers)
+
 def update_data():
     """Update data function"""
     logging.info("Starting data update thread...")
+    if SHARED_INGESTION and ticker_stream is None:
+        start_ingestion()
+    elif STREAMING_MODE and ticker_stream is None:
+        start_streaming()
+
+    # Each data class refreshes on its own cadence, concurrently with the others
+    scheduler = Scheduler()
+    scheduler.add(
+        'solana',
+        lambda: run_update_job('solana', fetch_solana_token_data),
+        UPDATE_INTERVALS['solana'],
+        throttled=throttled('solanafn', 'solscan', 'binance', 'coingecko')
+    )
+    scheduler.add(
+        'btc',
+        lambda: run_update_job('btc', fetch_btc_data),
+        UPDATE_INTERVALS['btc'],
+        throttled=throttled('binance', 'coingecko')
+    )
+    # A fixed number of CoinGecko pages per cycle, whatever the universe size
+    scheduler.add(
+        'markets',
+        lambda: run_update_job('markets', fetch_with_deadline, 'coingecko', sync_markets),
+        UPDATE_INTERVALS['markets'],
+        throttled=throttled('coingecko')
+    )
+    scheduler.add('checkpoint', save_checkpoint, CHECKPOINT_INTERVAL)
+    scheduler.run_forever()
+
+def data_ages():
+    """Seconds since each asset's data was fetched upstream"""
+    ages = {}
+    now = datetime.now()
+    for asset in ('solana_token', 'btc'):
+        last_update = crypto_data[asset].get('last_update')
+        if last_update:
+            ages[(asset,)] = (now - datetime.fromisoformat(last_update)).total_seconds()
+    # The top 100 all come from the first market page
+    markets_age = market_table.page_age(1)
+    if markets_age is not None:
+        ages[('top_100',)] = markets_age
+    return ages
+
+def provider_metric(field):
+    """Scrape-time callback exporting one field of the shared session's provider stats"""
+    return lambda: {(provider,): stats[field] for provider, stats in http_client.provider_stats().items()}
+
+registry.gauge('crypto_data_age_seconds', 'Age of the data served per asset', ['asset'], callback=data_ages)
+registry.gauge('crypto_provider_requests', 'HTTP requests made per provider', ['provider'], callback=provider_metric('requests'))
+registry.gauge('crypto_provider_errors', 'Failed HTTP requests per provider', ['provider'], callback=provider_metric('errors'))
+registry.gauge('crypto_provider_avg_latency_ms', 'Average HTTP latency per provider', ['provider'], callback=provider_metric('avg_latency_ms'))
+
+def save_checkpoint():
+    """Write the last broadcast and the market table to the warm-start checkpoint"""
+    try:
+        atomic_write(CHECKPOINT_PATH, json.dumps({
+            'saved_at': time.time(),
+            'snapshot': full_snapshot(),
+            'markets': market_table.dump(),
+            'detectors': detection.state()
+        }, separators=(',', ':')).encode('utf-8'))
+    except Exception as e:
+        logging.error(f"Error saving checkpoint: {str(e)}")
+
+def load_checkpoint():
+    """Serve the last checkpointed data, marked stale, until fresh fetches replace it"""
+    try:
+        with open(CHECKPOINT_PATH, 'rb') as f:
+            checkpoint = json.loads(f.read())
+        market_table.load(checkpoint.get('markets', {}), stale=True)
+        detection.load_state(checkpoint.get('detectors', {}))
+        data = checkpoint['snapshot']
+        version = data.pop('version', None)
+        for asset in ('solana_token', 'btc'):
+            data[asset]['stale'] = True
+        data['top_100_status'] = {'stale': market_table.stale}
+        # Restored samples were recorded before the restart
+        for series, asset in (('sol', 'solana_token'), ('btc', 'btc')):
+            history_marks[series] = data[asset].get('last_update')
+        for coin in data['top_100']:
+            synced_at = market_table.synced_at(coin['id'])
+            if synced_at:
+                history_marks[coin['id']] = datetime.fromtimestamp(synced_at).isoformat()
+        crypto_data.update(data)
+        broadcast_update(version)
+        logging.info(f"Warm started from checkpoint saved {time.time() - checkpoint['saved_at']:.0f}s ago")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.error(f"Error loading checkpoint: {str(e)}")
+
+def follow_snapshot():
+    """Adopt the leader's latest snapshot and alerts and broadcast them to this worker's clients"""
+    follow_alerts()
+    markets = markets_store.read_if_changed()
+    if markets:
+        market_table.load(markets)
+    data = snapshot_store.read_if_changed()
+    if not data:
+        return
+    version = data.pop('version', None)
+    if version is not None and version <= snapshot_version:
+        # Leader restarted and reset its counter; keep ours moving forward
+        version = None
+    crypto_data.clear()
+    crypto_data.update(data)
+    broadcast_update(version)
+
+def run_worker():
+    """Run the updater if elected leader, otherwise follow the shared snapshot"""
     while True:
         try:
-            with app.app_context():
-                logging.info("Fetching new data...")
-                fetch_solana_token_data()
-                fetch_btc_data()
-                fetch_top_100_coins()
-                logging.info(f"Current crypto data: {crypto_data}")
-                socketio.emit('data_update', crypto_data, namespace='/')
-                logging.info("Emitted data update")
+            if leader_lock.try_acquire():
+                logging.info("Elected data updater leader")
+                update_data()
+            follow_snapshot()
         except Exception as e:
-            logging.error(f"Error in update_data: {str(e)}")
-        time.sleep(30)  # Update every 30 seconds
+            logging.error(f"Error following snapshot: {str(e)}")
+        time.sleep(SNAPSHOT_POLL_INTERVAL)
+
+def start_background_tasks():
+    """Warm start from the last checkpoint, then start the leader election / updater loop"""
+    load_checkpoint()
+    socketio.start_background_task(run_worker)
 
 @app.route('/')
 def index():
@@ -290,27 +991,165 @@ def index():
 @app.route('/api/data')
 def get_data():
     logging.info("API data request received")
-    return jsonify(crypto_data)
+    snapshot = current_snapshot
+    if request.args.get('format') == 'msgpack':
+        etag = f"{snapshot.etag}-msgpack"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(snapshot.compact_body, mimetype='application/msgpack')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    # Each encoding is its own representation, so each gets its own strong ETag
+    if snapshot.br_body and 'br' in request.accept_encodings:
+        encoding, body = 'br', snapshot.br_body
+    elif 'gzip' in request.accept_encodings:
+        encoding, body = 'gzip', snapshot.gzip_body
+    else:
+        encoding, body = None, snapshot.body
+    etag = f"{snapshot.etag}-{encoding}" if encoding else snapshot.etag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/history/<asset>')
+def get_history(asset):
+    """Raw samples, or OHLC candles when an interval (seconds) is given"""
+    try:
+        if not history.columns(asset):
+            return jsonify({'error': f"No history for {asset}"}), 404
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        interval = request.args.get('interval', type=float)
+        if interval:
+            column = request.args.get('column', 'price')
+            return jsonify({
+                'asset': asset,
+                'column': column,
+                'interval': interval,
+                'candles': history.ohlc(asset, column, interval, start, end)
+            })
+        data = history.read(asset, start, end)
+        return jsonify({'asset': asset, 'samples': {column: values.tolist() for column, values in data.items()}})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/providers')
+def get_provider_stats():
+    return jsonify(http_client.provider_stats())
+
+@app.route('/api/coins')
+def get_coins():
+    """One page of the market table: sort=<field>&order=asc|desc, min_<field>/max_<field>
+    ranges on numeric fields, and search=<prefix of id, symbol or name>"""
+    sort = request.args.get('sort', 'market_cap_rank')
+    if sort not in NUMERIC_FIELDS + TEXT_FIELDS:
+        return jsonify({'error': f"Cannot sort by {sort}"}), 400
+    ranges = {}
+    for field in NUMERIC_FIELDS:
+        low = request.args.get(f'min_{field}')
+        high = request.args.get(f'max_{field}')
+        try:
+            ranges[field] = (float(low) if low else None, float(high) if high else None)
+        except ValueError:
+            return jsonify({'error': f"Invalid range for {field}"}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), COINS_MAX_PER_PAGE)
+    total, coins = market_table.query(
+        sort=sort,
+        descending=request.args.get('order', 'asc') == 'desc',
+        ranges=ranges,
+        prefix=request.args.get('search'),
+        page=page,
+        per_page=per_page
+    )
+    return jsonify({
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'stale': market_table.stale,
+        'coins': coins
+    })
+
+@app.route('/metrics')
+def get_metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+def room_list(rooms):
+    """The room names from a client-supplied list, or none if it isn't one"""
+    return [room for room in rooms if isinstance(room, str)] if isinstance(rooms, list) else []
+
+def subscribe_rooms(rooms, wire_format='json'):
+    """Join the requested rooms and send each one's full snapshot to this client only"""
+    for room in rooms:
+        if not isinstance(room, str) or not ROOM_PATTERN.match(room):
+            logging.error(f"Ignoring subscription to unknown room {room}")
+            continue
+        if room == 'top100' and wire_format == 'msgpack':
+            join_room(COMPACT_ROOM)
+            emit('top100_meta', msgpack.packb(compact_metadata(last_broadcast['top_100'])))
+            emit('top100_compact', current_snapshot.top100_compact)
+            continue
+        join_room(room)
+        emit('room_snapshot', room_snapshot(room))
 
 @socketio.on('connect', namespace='/')
-def handle_connect():
+def handle_connect(auth=None):
     logging.info('Client connected')
-    socketio.emit('data_update', crypto_data, namespace='/')
-    logging.info('Sent initial data to client')
+    CONNECTED_CLIENTS.inc()
+    # Clients may pick their rooms up front; otherwise they get every asset and the full table
+    auth = auth if isinstance(auth, dict) else {}
+    rooms = room_list(auth.get('rooms', DEFAULT_ROOMS))
+    subscribe_rooms(rooms, auth.get('format', 'json'))
+    logging.info(f'Sent initial data to client for rooms {rooms}')
+
+@socketio.on('subscribe', namespace='/')
+def handle_subscribe(data):
+    if not isinstance(data, dict):
+        logging.error(f"Ignoring malformed subscribe request: {data!r}")
+        return
+    subscribe_rooms(room_list(data.get('rooms')), data.get('format', 'json'))
+
+@socketio.on('unsubscribe', namespace='/')
+def handle_unsubscribe(data):
+    if not isinstance(data, dict):
+        logging.error(f"Ignoring malformed unsubscribe request: {data!r}")
+        return
+    for room in room_list(data.get('rooms')):
+        leave_room(room)
+        if room == 'top100':
+            leave_room(COMPACT_ROOM)
+
+@socketio.on('resync', namespace='/')
+def handle_resync(data):
+    if not isinstance(data, dict):
+        logging.error(f"Ignoring malformed resync request: {data!r}")
+        return
+    logging.info(f"Client requested resync of {data.get('room')}")
+    subscribe_rooms([data.get('room')])
 
 @socketio.on('disconnect', namespace='/')
 def handle_disconnect():
     logging.info('Client disconnected')
+    CONNECTED_CLIENTS.dec()
 
 @socketio.on_error(namespace='/')
 def error_handler(e):
     logging.error(f'SocketIO error: {str(e)}')
 
 if __name__ == '__main__':
-    # Start the data update loop in a separate thread
-    update_thread = threading.Thread(target=update_data, daemon=True)
-    update_thread.start()
-    
+    # Start the data update loop (or snapshot follower) in the background
+    start_background_tasks()
+
     # Get port from environment variable or use 5000
     port = int(os.getenv('PORT', 5000))
     
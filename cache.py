@@ -0,0 +1,116 @@
+"""TTL + stale-while-revalidate cache for provider responses"""
+import functools
+import os
+import threading
+import time
+import logging
+
+# How long a caller waits for a background refresh before taking the stale value
+STALE_GRACE = float(os.getenv('CACHE_STALE_GRACE', 1.0))
+
+class CacheEntry:
+    def __init__(self, value, fetched_at):
+        self.value = value
+        self.fetched_at = fetched_at
+        # Wall-clock time of the fetch, fixed for the life of the entry
+        self.fetched_time = time.time()
+
+class Refresh:
+    """An upstream call in flight that other callers can wait on"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+class ProviderCache:
+    """Caches provider responses per key.
+
+    Entries younger than ``ttl`` are served as-is. Between ``ttl`` and
+    ``ttl + max_stale`` a single background refresh is started and callers
+    get its result if it lands within ``stale_grace`` seconds, otherwise the
+    stale value. Older entries are fetched synchronously, and concurrent
+    callers for the same key share one upstream call. Failed fetches (None)
+    are never cached.
+    """
+
+    def __init__(self, stale_grace=STALE_GRACE):
+        self.stale_grace = stale_grace
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = {}
+
+    def cached(self, ttl, max_stale=0):
+        """Decorator caching a fetcher's result per call arguments"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args):
+                key = (func.__name__,) + args
+                return self.get(key, lambda: func(*args), ttl, max_stale)
+            wrapper.uncached = func
+            wrapper.age = lambda *args: self.age((func.__name__,) + args)
+            wrapper.fetched_time = lambda *args: self.fetched_time((func.__name__,) + args)
+            return wrapper
+        return decorator
+
+    def get(self, key, fetch, ttl, max_stale=0):
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.monotonic() - entry.fetched_at if entry else None
+            if entry and age < ttl:
+                return entry.value
+            stale = entry.value if entry and age < ttl + max_stale else None
+            refresh = self._inflight.get(key)
+            leader = refresh is None
+            if leader:
+                refresh = self._inflight[key] = Refresh()
+
+        if stale is not None:
+            if leader:
+                logging.info(f"Serving stale {key[0]} ({age:.0f}s old) while refreshing")
+                threading.Thread(target=self._refresh, args=(key, fetch, refresh), daemon=True).start()
+            # Prefer the fresh value if the refresh is quick, otherwise serve stale
+            if refresh.done.wait(self.stale_grace) and refresh.value is not None:
+                return refresh.value
+            return stale
+
+        if leader:
+            return self._refresh(key, fetch, refresh)
+        refresh.done.wait()
+        return refresh.value
+
+    def _refresh(self, key, fetch, refresh):
+        try:
+            refresh.value = fetch()
+            if refresh.value is not None:
+                with self._lock:
+                    self._entries[key] = CacheEntry(refresh.value, time.monotonic())
+            return refresh.value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            refresh.done.set()
+
+    def peek(self, key):
+        """Return the cached value for a key regardless of age"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry else None
+
+    def age(self, key):
+        """Seconds since a key was last fetched, or None if never"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return time.monotonic() - entry.fetched_at if entry else None
+
+    def fetched_time(self, key):
+        """Wall-clock time a key was last fetched, or None if never"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.fetched_time if entry else None
+
+    def clear(self):
+        """Drop every cached entry so the next calls go upstream"""
+        with self._lock:
+            self._entries.clear()
+
+# Cache shared by all provider fetchers
+provider_cache = ProviderCache()
@@ -0,0 +1,184 @@
+"""Secondary indexes over the market table: sorted arrays per field and a prefix trie"""
+import bisect
+
+# Fields with a sorted index; the numeric ones can also be range-filtered
+NUMERIC_FIELDS = ('market_cap_rank', 'current_price', 'market_cap', 'price_change_percentage_24h', 'total_volume')
+TEXT_FIELDS = ('name', 'symbol')
+
+def sort_key(field, value):
+    if value is None:
+        return None
+    return value.lower() if field in TEXT_FIELDS else value
+
+def search_terms(coin):
+    """Lower-cased terms a coin can be found by: id, symbol, full name and each name word"""
+    name = (coin.get('name') or '').lower()
+    return {coin['id'], (coin.get('symbol') or '').lower(), name, *name.split()} - {''}
+
+class SortedIndex:
+    """Coin ids ordered by one field, kept as a sorted array of (key, id).
+
+    Coins without a value are tracked separately and sort last.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.keys = []
+        self.missing = set()
+
+    def __len__(self):
+        return len(self.entries) + len(self.missing)
+
+    def add(self, coin_id, key):
+        if key is None:
+            self.missing.add(coin_id)
+            return
+        i = bisect.bisect_left(self.entries, (key, coin_id))
+        self.entries.insert(i, (key, coin_id))
+        self.keys.insert(i, key)
+
+    def remove(self, coin_id, key):
+        if key is None:
+            self.missing.discard(coin_id)
+            return
+        i = bisect.bisect_left(self.entries, (key, coin_id))
+        if i < len(self.entries) and self.entries[i] == (key, coin_id):
+            del self.entries[i]
+            del self.keys[i]
+
+    def bounds(self, low=None, high=None):
+        """Slice of entries with low <= key <= high"""
+        start = bisect.bisect_left(self.keys, low) if low is not None else 0
+        stop = bisect.bisect_right(self.keys, high) if high is not None else len(self.keys)
+        return start, max(start, stop)
+
+    def ids(self, start, stop):
+        return [coin_id for _, coin_id in self.entries[start:stop]]
+
+class PrefixTrie:
+    """Maps every prefix of every term to the ids having that term.
+
+    Each node counts, per id, how many of that id's terms pass through it,
+    so removing one term keeps prefixes shared with the id's other terms.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, term, coin_id):
+        node = self.root
+        for char in term:
+            node = node.setdefault(char, {'': {}})
+            node[''][coin_id] = node[''].get(coin_id, 0) + 1
+
+    def remove(self, term, coin_id):
+        node = self.root
+        path = []
+        for char in term:
+            if char not in node:
+                return
+            path.append((node, char))
+            node = node[char]
+            counts = node['']
+            counts[coin_id] -= 1
+            if not counts[coin_id]:
+                del counts[coin_id]
+        # Prune branches no coin passes through any more
+        for parent, char in reversed(path):
+            if parent[char]['']:
+                break
+            del parent[char]
+
+    def search(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return set(node[''])
+
+class CoinIndex:
+    """Sorted indexes per field plus a search trie, updated coin by coin.
+
+    Queries bisect the sort index for ranges and read only the requested
+    page, so they don't scan the whole table. Extra range filters and
+    prefix searches narrow a candidate set from their own indexes first.
+    """
+
+    def __init__(self):
+        self.indexes = {field: SortedIndex() for field in NUMERIC_FIELDS + TEXT_FIELDS}
+        self.trie = PrefixTrie()
+        self._keys = {}   # coin id -> (sort keys per field, search terms)
+
+    def update(self, coin):
+        """Index a new or changed coin, touching only the fields that changed"""
+        coin_id = coin['id']
+        keys = {field: sort_key(field, coin.get(field)) for field in self.indexes}
+        terms = search_terms(coin)
+        old_keys, old_terms = self._keys.get(coin_id, ({}, set()))
+        for field, key in keys.items():
+            if coin_id in self._keys and old_keys[field] == key:
+                continue
+            if coin_id in self._keys:
+                self.indexes[field].remove(coin_id, old_keys[field])
+            self.indexes[field].add(coin_id, key)
+        for term in old_terms - terms:
+            self.trie.remove(term, coin_id)
+        for term in terms - old_terms:
+            self.trie.add(term, coin_id)
+        self._keys[coin_id] = (keys, terms)
+
+    def remove(self, coin_id):
+        keys, terms = self._keys.pop(coin_id, (None, ()))
+        if keys is None:
+            return
+        for field, key in keys.items():
+            self.indexes[field].remove(coin_id, key)
+        for term in terms:
+            self.trie.remove(term, coin_id)
+
+    def query(self, sort='market_cap_rank', descending=False, ranges=None, prefix=None, offset=0, limit=50):
+        """Total matching coins and the ids of one page of them, in sort order.
+
+        ``ranges`` maps numeric fields to (low, high) bounds, either of which
+        may be None.
+        """
+        ranges = {field: bounds for field, bounds in (ranges or {}).items() if bounds != (None, None)}
+        index = self.indexes[sort]
+        sort_range = ranges.pop(sort, (None, None))
+        start, stop = index.bounds(*sort_range)
+        filtered = sort_range != (None, None)
+
+        # Candidates from the prefix search and the other range filters
+        candidate_sets = []
+        if prefix:
+            candidate_sets.append(self.trie.search(prefix.lower()))
+        for field, (low, high) in ranges.items():
+            field_index = self.indexes[field]
+            candidate_sets.append(set(field_index.ids(*field_index.bounds(low, high))))
+        candidates = set.intersection(*candidate_sets) if candidate_sets else None
+
+        if candidates is None:
+            # Only the sort field is constrained: read the page straight off the index
+            missing = [] if filtered else sorted(index.missing)
+            total = stop - start + len(missing)
+            if descending:
+                ids = index.ids(max(start, stop - offset - limit), max(start, stop - offset))[::-1]
+            else:
+                ids = index.ids(min(stop, start + offset), min(stop, start + offset + limit))
+            if len(ids) < limit and not filtered:
+                skip = max(0, offset - (stop - start))
+                ids += missing[skip:skip + limit - len(ids)]
+            return total, ids
+
+        # Only the candidates get sorted, never the whole table
+        if filtered:
+            candidates &= set(index.ids(start, stop))
+        keys = self._keys
+        present = sorted(
+            (coin_id for coin_id in candidates if keys[coin_id][0][sort] is not None),
+            key=lambda coin_id: (keys[coin_id][0][sort], coin_id),
+            reverse=descending
+        )
+        ordered = present + sorted(coin_id for coin_id in candidates if keys[coin_id][0][sort] is None)
+        return len(ordered), ordered[offset:offset + limit]
@@ -0,0 +1,484 @@
+"""Streaming detectors over price, volume and holder samples, with rate-limited async alert delivery"""
+import os
+import json
+import math
+import time
+import heapq
+import queue
+import logging
+import threading
+from collections import deque, namedtuple
+
+import numpy as np
+
+import http_client
+
+Alert = namedtuple('Alert', ['detector', 'subject', 'timestamp', 'value', 'message'])
+
+class RollingWindow:
+    """Fixed-capacity ring buffer of timestamped values bounded to max_age seconds.
+
+    Alongside each value it keeps the running total of everything pushed so
+    far, so the sum over any slice of the window is a single subtraction.
+    """
+
+    def __init__(self, capacity, max_age):
+        self.capacity = capacity
+        self.max_age = max_age
+        self._times = np.zeros(capacity)
+        self._values = np.zeros(capacity)
+        self._totals = np.zeros(capacity)
+        self._start = 0
+        self._count = 0
+        self._total = 0.0
+
+    def __len__(self):
+        return self._count
+
+    def _index(self, i):
+        return (self._start + i) % self.capacity
+
+    def _total_before(self, i):
+        idx = self._index(i)
+        return self._totals[idx] - self._values[idx]
+
+    def push(self, timestamp, value):
+        """Add a sample, dropping the oldest when full or older than max_age"""
+        if self._count == self.capacity:
+            self._pop()
+        idx = self._index(self._count)
+        if idx == 0 and self._count:
+            # Rebase the running totals once per lap to keep them small
+            base = self._total_before(0)
+            self._totals -= base
+            self._total -= base
+        self._total += value
+        self._times[idx] = timestamp
+        self._values[idx] = value
+        self._totals[idx] = self._total
+        self._count += 1
+        self.evict(timestamp - self.max_age)
+
+    def _pop(self):
+        self._start = (self._start + 1) % self.capacity
+        self._count -= 1
+
+    def evict(self, cutoff):
+        """Drop samples older than the cutoff timestamp"""
+        while self._count and self._times[self._start] < cutoff:
+            self._pop()
+
+    def last(self):
+        return self._values[self._index(self._count - 1)] if self._count else None
+
+    def samples(self):
+        """(timestamp, value) pairs, oldest first"""
+        idx = [self._index(i) for i in range(self._count)]
+        return [[float(self._times[i]), float(self._values[i])] for i in idx]
+
+    def window_sum(self, start=None, stop=None):
+        """Sum of values in window[start:stop] (slice semantics, oldest first)"""
+        i, j, _ = slice(start, stop).indices(self._count)
+        if j <= i:
+            return 0.0
+        return float(self._totals[self._index(j - 1)] - self._total_before(i))
+
+    def sum(self):
+        return self.window_sum()
+
+    def mean(self):
+        return self.sum() / self._count if self._count else 0.0
+
+class EWMA:
+    """Exponentially weighted mean and variance, updated in O(1) per value"""
+
+    def __init__(self, alpha, mean=0.0, var=0.0, count=0):
+        self.alpha = alpha
+        self.mean = mean
+        self.var = var
+        self.count = count
+
+    def zscore(self, value):
+        std = math.sqrt(self.var)
+        return (value - self.mean) / std if std > 0 else 0.0
+
+    def update(self, value):
+        if not self.count:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            increment = self.alpha * diff
+            self.mean += increment
+            self.var = (1 - self.alpha) * (self.var + diff * increment)
+        self.count += 1
+
+class Detector:
+    """Consumes samples of one kind (``market`` or ``holders``) and returns an
+    Alert when one looks anomalous, keeping a little state per subject.
+
+    Market samples carry ``price`` and ``volume``; holder samples carry
+    ``balances`` (owner -> token amount) and ``transaction_volume``.
+    """
+    name = None
+    kind = 'market'
+
+    def __init__(self):
+        self.subjects = {}
+
+    def update(self, sample):
+        raise NotImplementedError
+
+    def state(self):
+        """JSON-serializable per-subject state, for checkpoints"""
+        return {subject: dict(vars(state)) for subject, state in self.subjects.items()}
+
+    def load_state(self, state):
+        self.subjects = {subject: EWMA(**values) for subject, values in state.items()}
+
+class VolumeSurge(Detector):
+    """Summed volume of the last ``periods`` samples against the ``periods`` before them"""
+    name = 'volume_surge'
+
+    def __init__(self, threshold=50, min_volume=100000, periods=6, capacity=289, max_age=24 * 60 * 60):
+        super().__init__()
+        self.threshold = threshold
+        self.min_volume = min_volume
+        self.periods = periods
+        self.capacity = capacity
+        self.max_age = max_age
+
+    def window(self, subject):
+        if subject not in self.subjects:
+            self.subjects[subject] = RollingWindow(self.capacity, self.max_age)
+        return self.subjects[subject]
+
+    def update(self, sample):
+        window = self.window(sample['subject'])
+        if sample['volume'] > 0:
+            window.push(sample['timestamp'], sample['volume'])
+        # Until both halves are filled the comparison is against a partial window
+        if len(window) < 2 * self.periods:
+            return None
+
+        recent_volume = window.window_sum(-self.periods)
+        previous_volume = window.window_sum(-2 * self.periods, -self.periods)
+        if previous_volume == 0:
+            return None
+
+        volume_increase = (recent_volume - previous_volume) / previous_volume * 100
+        if volume_increase > self.threshold and recent_volume > self.min_volume:
+            return Alert(self.name, sample['subject'], sample['timestamp'], volume_increase, (
+                f"Significant accumulation detected for {sample['subject']}!\n"
+                f"Volume increase: {volume_increase:.2f}%\n"
+                f"Current price: {sample['price']:.2f}"
+            ))
+        return None
+
+    def state(self):
+        return {subject: window.samples() for subject, window in self.subjects.items()}
+
+    def load_state(self, state):
+        # Samples older than the window span are dropped, even if none arrived since
+        cutoff = time.time() - self.max_age
+        self.subjects = {}
+        for subject, samples in state.items():
+            window = self.window(subject)
+            for timestamp, value in samples:
+                window.push(timestamp, value)
+            window.evict(cutoff)
+
+class VolumeZScore(Detector):
+    """Volume more than ``threshold`` standard deviations above its EWMA"""
+    name = 'volume_zscore'
+
+    def __init__(self, alpha=0.1, threshold=3.0, warmup=10):
+        super().__init__()
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+
+    def update(self, sample):
+        if sample['volume'] <= 0:
+            return None
+        stats = self.subjects.setdefault(sample['subject'], EWMA(self.alpha))
+        zscore = stats.zscore(sample['volume']) if stats.count >= self.warmup else 0.0
+        stats.update(sample['volume'])
+        if zscore > self.threshold:
+            return Alert(self.name, sample['subject'], sample['timestamp'], zscore, (
+                f"Unusual volume for {sample['subject']}: {sample['volume']:,.0f} "
+                f"is {zscore:.1f} standard deviations above its average"
+            ))
+        return None
+
+class VWAPDivergence(Detector):
+    """Price more than ``threshold`` percent away from its volume-weighted EWMA"""
+    name = 'vwap_divergence'
+
+    def __init__(self, alpha=0.1, threshold=5.0, warmup=10):
+        super().__init__()
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+
+    def update(self, sample):
+        if sample['price'] <= 0 or sample['volume'] <= 0:
+            return None
+        subject = sample['subject']
+        if subject not in self.subjects:
+            self.subjects[subject] = {'pv': EWMA(self.alpha), 'v': EWMA(self.alpha)}
+        stats = self.subjects[subject]
+        divergence = 0.0
+        if stats['v'].count >= self.warmup and stats['v'].mean > 0:
+            vwap = stats['pv'].mean / stats['v'].mean
+            divergence = (sample['price'] - vwap) / vwap * 100
+        stats['pv'].update(sample['price'] * sample['volume'])
+        stats['v'].update(sample['volume'])
+        if abs(divergence) > self.threshold:
+            return Alert(self.name, subject, sample['timestamp'], divergence, (
+                f"{subject} price {sample['price']:.2f} is {divergence:+.2f}% away from its VWAP"
+            ))
+        return None
+
+    def state(self):
+        return {
+            subject: {key: dict(vars(ewma)) for key, ewma in stats.items()}
+            for subject, stats in self.subjects.items()
+        }
+
+    def load_state(self, state):
+        self.subjects = {
+            subject: {key: EWMA(**values) for key, values in stats.items()}
+            for subject, stats in state.items()
+        }
+
+class HolderGrowth(Detector):
+    """Total holder balance up more than ``threshold`` percent since the last
+    sample, with at least ``min_volume`` moved in the recent transactions"""
+    name = 'holder_growth'
+    kind = 'holders'
+
+    def __init__(self, threshold=50, min_volume=100000, max_age=24 * 60 * 60):
+        super().__init__()
+        self.threshold = threshold
+        self.min_volume = min_volume
+        self.max_age = max_age
+
+    def update(self, sample):
+        subject = sample['subject']
+        total = sum(sample['balances'].values())
+        previous = self.subjects.get(subject)
+        self.subjects[subject] = {'total': total, 'timestamp': sample['timestamp']}
+        # A comparison across a long outage says nothing about the last period
+        if not previous or not previous['total'] or previous['timestamp'] < sample['timestamp'] - self.max_age:
+            return None
+
+        holder_increase = (total - previous['total']) / previous['total'] * 100
+        if holder_increase > self.threshold and sample['transaction_volume'] > self.min_volume:
+            return Alert(self.name, subject, sample['timestamp'], holder_increase, (
+                f"Significant accumulation detected for Solana token {subject}!\n"
+                f"Holder value increase: {holder_increase:.2f}%\n"
+                f"Total holder value: {total:.2f}"
+            ))
+        return None
+
+    def state(self):
+        return dict(self.subjects)
+
+    def load_state(self, state):
+        self.subjects = dict(state)
+
+class HolderConcentration(Detector):
+    """Share of supply held by the ``top_n`` largest holders moving more than
+    ``threshold`` percentage points between samples"""
+    name = 'holder_concentration'
+    kind = 'holders'
+
+    def __init__(self, top_n=10, threshold=2.0):
+        super().__init__()
+        self.top_n = top_n
+        self.threshold = threshold
+
+    def update(self, sample):
+        subject = sample['subject']
+        balances = sample['balances'].values()
+        total = sum(balances)
+        if not total:
+            return None
+        share = sum(heapq.nlargest(self.top_n, balances)) / total * 100
+        previous = self.subjects.get(subject)
+        self.subjects[subject] = share
+        if previous is None or abs(share - previous) <= self.threshold:
+            return None
+        return Alert(self.name, subject, sample['timestamp'], share - previous, (
+            f"Top {self.top_n} holders of {subject} now hold {share:.2f}% of supply "
+            f"({share - previous:+.2f} points)"
+        ))
+
+    def state(self):
+        return dict(self.subjects)
+
+    def load_state(self, state):
+        self.subjects = dict(state)
+
+def enabled_detectors(detectors):
+    """The detectors named in ALERT_DETECTORS, or all of them if it is unset"""
+    names = [name.strip() for name in os.getenv('ALERT_DETECTORS', '').split(',') if name.strip()]
+    return [detector for detector in detectors if not names or detector.name in names]
+
+class AlertLimiter:
+    """Drops repeats of an alert (same detector and subject) within the
+    cooldown, and anything past ``per_minute`` alerts overall"""
+
+    def __init__(self, cooldown=900, per_minute=10):
+        self.cooldown = cooldown
+        self.per_minute = per_minute
+        self._last_sent = {}
+        self._sent = deque()
+
+    def allow(self, alert, now=None):
+        now = now if now is not None else time.monotonic()
+        key = (alert.detector, alert.subject)
+        if key in self._last_sent and now - self._last_sent[key] < self.cooldown:
+            return False
+        while self._sent and self._sent[0] <= now - 60:
+            self._sent.popleft()
+        if len(self._sent) >= self.per_minute:
+            return False
+        self._last_sent[key] = now
+        self._sent.append(now)
+        return True
+
+class LogSink:
+    name = 'log'
+
+    def deliver(self, alert):
+        logging.info(alert.message)
+
+class FileSink:
+    """Appends each alert to a JSON lines file"""
+    name = 'file'
+
+    def __init__(self, path):
+        self.path = path
+
+    def deliver(self, alert):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(alert._asdict()) + '\n')
+
+class WebhookSink:
+    """POSTs each alert as JSON through the shared provider session"""
+    name = 'webhook'
+
+    def __init__(self, url, session=None):
+        self.url = url
+        self.session = session or http_client.session
+
+    def deliver(self, alert):
+        response = self.session.post(self.url, json=alert._asdict())
+        response.raise_for_status()
+
+class SocketIOSink:
+    """Emits each alert as an ``alert`` event through the given emit function"""
+    name = 'socketio'
+
+    def __init__(self, emit):
+        self.emit = emit
+
+    def deliver(self, alert):
+        self.emit('alert', alert._asdict())
+
+def sinks_from_env(emit=None):
+    """The sinks named in ALERT_SINKS (default log); none when ENABLE_ALERTS is false.
+    The socketio sink needs an emit function from the caller."""
+    if os.getenv('ENABLE_ALERTS', 'true').lower() != 'true':
+        return []
+    sinks = []
+    for name in os.getenv('ALERT_SINKS', 'log').split(','):
+        name = name.strip()
+        if name == 'log':
+            sinks.append(LogSink())
+        elif name == 'file':
+            sinks.append(FileSink(os.getenv('ALERT_FILE_PATH', 'data/alerts.jsonl')))
+        elif name == 'webhook' and os.getenv('ALERT_WEBHOOK_URL'):
+            sinks.append(WebhookSink(os.getenv('ALERT_WEBHOOK_URL')))
+        elif name == 'socketio' and emit:
+            sinks.append(SocketIOSink(emit))
+        elif name:
+            logging.error(f"Ignoring alert sink {name}: unknown or not configured")
+    return sinks
+
+class SinkWorker:
+    """Delivers alerts to one sink from its own thread and bounded queue, so a
+    slow or failing sink never blocks detection or the other sinks"""
+
+    def __init__(self, sink, max_pending=100):
+        self.sink = sink
+        self.pending = queue.Queue(maxsize=max_pending)
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def submit(self, alert):
+        try:
+            self.pending.put_nowait(alert)
+        except queue.Full:
+            logging.error(f"Alert sink {self.sink.name} is backed up, dropping {alert.detector} alert for {alert.subject}")
+
+    def run(self):
+        while True:
+            alert = self.pending.get()
+            try:
+                self.sink.deliver(alert)
+            except Exception as e:
+                logging.error(f"Error delivering alert to {self.sink.name}: {str(e)}")
+
+class DetectionEngine:
+    """Runs every detector on each sample as it arrives and hands the alerts
+    that pass the limiter to the sink workers"""
+
+    def __init__(self, detectors, sinks, limiter=None):
+        self.detectors = detectors
+        self.limiter = limiter or AlertLimiter(
+            cooldown=float(os.getenv('ALERT_COOLDOWN', 900)),
+            per_minute=int(os.getenv('ALERT_RATE_LIMIT', 10))
+        )
+        self.workers = [SinkWorker(sink) for sink in sinks]
+        self._lock = threading.Lock()
+
+    def process(self, sample):
+        """Feed one sample to the detectors of its kind; returns the alerts raised"""
+        alerts = []
+        with self._lock:
+            for detector in self.detectors:
+                if detector.kind != sample['kind']:
+                    continue
+                try:
+                    alert = detector.update(sample)
+                except Exception as e:
+                    logging.error(f"Error in detector {detector.name}: {str(e)}")
+                    continue
+                if alert:
+                    alerts.append(alert)
+        for alert in alerts:
+            self.publish(alert)
+        return alerts
+
+    def publish(self, alert):
+        """Queue an alert on every sink unless it is a repeat or over the rate limit"""
+        with self._lock:
+            allowed = self.limiter.allow(alert)
+        if not allowed:
+            logging.info(f"Suppressed repeated {alert.detector} alert for {alert.subject}")
+            return False
+        for worker in self.workers:
+            worker.submit(alert)
+        return True
+
+    def state(self):
+        with self._lock:
+            return {detector.name: detector.state() for detector in self.detectors}
+
+    def load_state(self, state):
+        with self._lock:
+            for detector in self.detectors:
+                if detector.name in state:
+                    detector.load_state(state[detector.name])
@@ -0,0 +1,6 @@
+# Gunicorn settings; loaded automatically from the working directory
+
+def post_worker_init(worker):
+    # Each worker either wins the updater leader lock or follows the shared snapshot
+    from app import start_background_tasks
+    start_background_tasks()
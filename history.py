@@ -0,0 +1,179 @@
+"""Append-only columnar time-series store for fetched samples"""
+import os
+import re
+import json
+import time
+import logging
+import threading
+
+import numpy as np
+
+from snapshot_store import atomic_write
+
+SERIES_NAME = re.compile(r'^[a-z0-9_-]+$')
+DTYPE = '<f8'
+
+class HistoryStore:
+    """Stores each series as one flat float64 file per column.
+
+    ``<root>/<series>/ts`` holds epoch-second timestamps in append order and
+    every other column file holds the matching values, so range reads are a
+    binary search over a memory-mapped ``ts`` followed by plain slices.
+    Samples are buffered in memory and appended to disk every
+    ``flush_interval`` seconds; ``compact`` drops data older than the
+    retention window.
+    """
+
+    def __init__(self, root, flush_interval=60, retention_days=365):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.retention = retention_days * 86400
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._buffers = {}
+        self._columns = {}
+        self._last_ts = {}
+        self._last_flush = time.time()
+
+    def _series_dir(self, series):
+        if not SERIES_NAME.match(series):
+            raise ValueError(f"Invalid series name: {series}")
+        return os.path.join(self.root, series)
+
+    def columns(self, series):
+        """Column names stored for a series, not counting ts"""
+        if series not in self._columns:
+            path = os.path.join(self._series_dir(series), 'columns.json')
+            try:
+                with open(path) as f:
+                    self._columns[series] = json.load(f)
+            except FileNotFoundError:
+                return []
+        return self._columns[series]
+
+    def series(self):
+        """Names of every series on disk or waiting to be flushed"""
+        names = set(self._buffers)
+        if os.path.isdir(self.root):
+            names.update(name for name in os.listdir(self.root) if SERIES_NAME.match(name))
+        return sorted(names)
+
+    def append(self, series, values, ts=None):
+        """Buffer one sample; the first sample fixes the series' columns.
+
+        Reads binary-search ``ts``, so a sample not newer than the series'
+        last one is dropped. Returns whether the sample was kept.
+        """
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            if series not in self._last_ts:
+                stored = self._load(series, 'ts') if self.columns(series) else []
+                self._last_ts[series] = float(stored[-1]) if len(stored) else None
+            if self._last_ts[series] is not None and ts <= self._last_ts[series]:
+                logging.info(f"Dropping out-of-order {series} sample at {ts}")
+                return False
+            self._last_ts[series] = ts
+            columns = self.columns(series)
+            if not columns:
+                columns = self._columns[series] = sorted(values)
+                os.makedirs(self._series_dir(series), exist_ok=True)
+                atomic_write(os.path.join(self._series_dir(series), 'columns.json'),
+                             json.dumps(columns).encode())
+            row = [ts] + [float(values.get(column) or 0) for column in columns]
+            self._buffers.setdefault(series, []).append(row)
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Append buffered samples to the column files"""
+        # Rows leave the buffer and reach disk under one lock, so readers see them in exactly one place
+        with self._disk_lock:
+            with self._lock:
+                buffers, self._buffers = self._buffers, {}
+                self._last_flush = time.time()
+            for series, rows in buffers.items():
+                data = np.asarray(rows, dtype=DTYPE)
+                directory = self._series_dir(series)
+                for i, column in enumerate(['ts'] + self.columns(series)):
+                    with open(os.path.join(directory, column), 'ab') as f:
+                        data[:, i].tofile(f)
+        if buffers:
+            logging.info(f"Flushed history for {len(buffers)} series")
+
+    def _load(self, series, column):
+        path = os.path.join(self._series_dir(series), column)
+        count = os.path.getsize(path) // np.dtype(DTYPE).itemsize if os.path.exists(path) else 0
+        if count == 0:
+            return np.empty(0, dtype=DTYPE)
+        return np.memmap(path, dtype=DTYPE, mode='r', shape=(count,))
+
+    def _read_disk(self, series, start=None, end=None):
+        """Flushed columns (including ts) for start <= ts <= end, sliced off the memmaps"""
+        columns = ['ts'] + self.columns(series)
+        arrays = [self._load(series, column) for column in columns]
+        # A crash mid-flush can leave columns of different lengths
+        length = min(len(array) for array in arrays)
+        ts = arrays[0][:length]
+        lo = 0 if start is None else np.searchsorted(ts, start, side='left')
+        hi = length if end is None else np.searchsorted(ts, end, side='right')
+        return {column: np.asarray(array[lo:hi]) for column, array in zip(columns, arrays)}
+
+    def read(self, series, start=None, end=None):
+        """Columns (including ts) for samples with start <= ts <= end"""
+        with self._disk_lock:
+            with self._lock:
+                pending = list(self._buffers.get(series, []))
+            data = self._read_disk(series, start, end)
+        if pending:
+            # Only the pending rows in range are copied next to the disk slice
+            pending = np.asarray(pending, dtype=DTYPE)
+            in_range = np.ones(len(pending), dtype=bool)
+            if start is not None:
+                in_range &= pending[:, 0] >= start
+            if end is not None:
+                in_range &= pending[:, 0] <= end
+            if in_range.any():
+                data = {
+                    column: np.concatenate([array, pending[in_range, i]])
+                    for i, (column, array) in enumerate(data.items())
+                }
+        return data
+
+    def ohlc(self, series, column, interval, start=None, end=None):
+        """Downsample a column into open/high/low/close candles of interval seconds"""
+        data = self.read(series, start, end)
+        ts, values = data['ts'], data.get(column)
+        if values is None or not len(ts):
+            return []
+
+        buckets = np.floor(ts / interval) * interval
+        starts = np.r_[0, np.flatnonzero(np.diff(buckets)) + 1]
+        ends = np.r_[starts[1:] - 1, len(ts) - 1]
+        return [
+            {'t': float(t), 'open': float(o), 'high': float(h), 'low': float(l), 'close': float(c)}
+            for t, o, h, l, c in zip(
+                buckets[starts],
+                values[starts],
+                np.maximum.reduceat(values, starts),
+                np.minimum.reduceat(values, starts),
+                values[ends]
+            )
+        ]
+
+    def compact(self):
+        """Rewrite every series without samples older than the retention window"""
+        self.flush()
+        cutoff = time.time() - self.retention
+        for series in self.series():
+            columns = ['ts'] + self.columns(series)
+            with self._disk_lock:
+                # Only flushed rows: anything still buffered is appended by the next flush
+                data = self._read_disk(series)
+                keep = np.searchsorted(data['ts'], cutoff, side='left')
+                if keep == 0:
+                    continue
+                directory = self._series_dir(series)
+                for column in columns:
+                    atomic_write(os.path.join(directory, column), data[column][keep:].astype(DTYPE).tobytes())
+            logging.info(f"Compacted history for {series}, dropped {keep} samples")
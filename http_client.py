@@ -0,0 +1,142 @@
+"""Shared HTTP layer for all upstream data providers"""
+import os
+import threading
+import time
+import logging
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Connection settings
+CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 2))
+BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5))
+POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))
+POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))
+HOST_CONCURRENCY = int(os.getenv('HTTP_HOST_CONCURRENCY', 4))
+
+# Status codes providers use to tell us to slow down (418 is Binance's IP ban)
+THROTTLE_STATUSES = (418, 429)
+
+# Friendly provider names for the hosts we talk to
+PROVIDER_HOSTS = {
+    'api.solanafn.com': 'solanafn',
+    'public-api.solscan.io': 'solscan',
+    'api.mainnet-beta.solana.com': 'solana',
+    'api.coingecko.com': 'coingecko',
+    'binance.com': 'binance'
+}
+
+def provider_for(url):
+    """Map a URL to the provider name used in stats"""
+    host = urlparse(url).hostname or ''
+    for provider_host, provider in PROVIDER_HOSTS.items():
+        if host == provider_host or host.endswith('.' + provider_host):
+            return provider
+    return host
+
+def rebase_exchange(exchange, base_url):
+    """Point every REST endpoint of a ccxt exchange at base_url, keeping the paths"""
+    for name, url in exchange.urls['api'].items():
+        exchange.urls['api'][name] = base_url.rstrip('/') + urlparse(url).path
+
+class ProviderSession(requests.Session):
+    """Session with pooled keep-alive connections, timeouts, retries,
+    per-host concurrency limits and per-provider stats"""
+
+    def __init__(self):
+        super().__init__()
+        retries = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=retries
+        )
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self._host_limits = {}
+        self._stats = {}
+        self._throttled_at = {}
+
+    def _host_limit(self, host):
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(HOST_CONCURRENCY)
+            return self._host_limits[host]
+
+    def _record(self, provider, latency, error):
+        with self._lock:
+            stats = self._stats.setdefault(provider, {
+                'requests': 0,
+                'errors': 0,
+                'total_latency': 0.0,
+                'last_latency': 0.0
+            })
+            stats['requests'] += 1
+            stats['total_latency'] += latency
+            stats['last_latency'] = latency
+            if error:
+                stats['errors'] += 1
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = DEFAULT_TIMEOUT
+        provider = provider_for(url)
+        with self._host_limit(urlparse(url).hostname):
+            start = time.monotonic()
+            try:
+                response = super().request(method, url, **kwargs)
+            except Exception:
+                self._record(provider, time.monotonic() - start, True)
+                raise
+        self._record(provider, time.monotonic() - start, response.status_code >= 400)
+        if response.status_code in THROTTLE_STATUSES:
+            logging.warning(f"Provider {provider} is rate limiting us (HTTP {response.status_code})")
+            with self._lock:
+                self._throttled_at[provider] = time.monotonic()
+        return response
+
+    def throttled_since(self, since, *providers):
+        """Whether any of the providers rate limited us after the monotonic time since"""
+        with self._lock:
+            return any(self._throttled_at.get(provider, float('-inf')) >= since for provider in providers)
+
+    def stats(self):
+        """Latency and error-rate stats per provider"""
+        with self._lock:
+            return {
+                provider: {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'error_rate': stats['errors'] / stats['requests'],
+                    'avg_latency_ms': round(stats['total_latency'] / stats['requests'] * 1000, 2),
+                    'last_latency_ms': round(stats['last_latency'] * 1000, 2)
+                }
+                for provider, stats in self._stats.items()
+            }
+
+# Single session shared by every fetcher
+session = ProviderSession()
+
+def provider_stats():
+    """Stats for every provider the shared session has talked to"""
+    return session.stats()
+
+def log_provider_stats():
+    for provider, stats in provider_stats().items():
+        logging.info(
+            f"Provider {provider}: {stats['requests']} requests, "
+            f"{stats['error_rate']:.1%} errors, "
+            f"avg latency {stats['avg_latency_ms']}ms"
+        )
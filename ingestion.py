@@ -0,0 +1,359 @@
+"""Shared market data ingestion: each symbol is collected once and fanned out to
+in-process subscribers and, over a local socket, to other processes"""
+import os
+import json
+import time
+import queue
+import socket
+import logging
+import threading
+
+import ccxt
+
+import http_client
+from snapshot_store import LeaderLock
+from streaming import TickerStream
+
+INGESTION_SOCKET = os.getenv('INGESTION_SOCKET', 'data/ingestion.sock')
+INGESTION_POLL_INTERVAL = float(os.getenv('INGESTION_POLL_INTERVAL', 10))
+# Seconds after its last update before a symbol's ticker counts as stale
+INGESTION_STALE_AFTER = float(os.getenv('INGESTION_STALE_AFTER', 30))
+RECONNECT_DELAY_MAX = 60
+# Tickers queued for a socket subscriber before it counts as stuck and is dropped
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv('INGESTION_SUBSCRIBER_QUEUE', 1000))
+
+def create_exchange():
+    """Binance spot client on the shared HTTP session, pointed at BINANCE_API_URL if set"""
+    exchange = ccxt.binance({
+        'enableRateLimit': True,
+        'session': http_client.session,
+        'timeout': int(http_client.READ_TIMEOUT * 1000),
+        'options': {
+            'defaultType': 'spot'
+        }
+    })
+    if os.getenv('BINANCE_API_URL'):
+        http_client.rebase_exchange(exchange, os.getenv('BINANCE_API_URL'))
+    return exchange
+
+class LatestTickers:
+    """Latest ticker per symbol, dropped from reads once older than stale_after"""
+
+    def __init__(self, stale_after=INGESTION_STALE_AFTER):
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self._latest = {}
+
+    def set(self, symbol, ticker):
+        with self._lock:
+            self._latest[symbol] = (ticker, time.monotonic())
+
+    def get(self, symbol):
+        with self._lock:
+            entry = self._latest.get(symbol)
+        if not entry or time.monotonic() - entry[1] > self.stale_after:
+            return None
+        return entry[0]
+
+class IngestionCore:
+    """Collects tickers for the union of every subscriber's symbols, once.
+
+    With ``streaming`` on, one Binance websocket carries every symbol; the
+    rest, and any symbol whose stream has gone quiet, are polled together
+    in a single bulk request per interval. Each ticker is published to the
+    subscribers of its symbol, so more subscribers cost no upstream calls.
+    """
+
+    def __init__(self, exchange=None, streaming=False, poll_interval=INGESTION_POLL_INTERVAL):
+        self.exchange = exchange or create_exchange()
+        self.streaming = streaming
+        self.poll_interval = poll_interval
+        self.tickers = LatestTickers()
+        self._lock = threading.Lock()
+        self._subscribers = []  # (symbols, callback or None)
+        self._stream = None
+        self._started = False
+
+    @property
+    def symbols(self):
+        with self._lock:
+            return sorted(set().union(*(symbols for symbols, _ in self._subscribers)))
+
+    def subscribe(self, symbols, callback=None):
+        """Collect these symbols too; callback(symbol, ticker) receives each of their tickers"""
+        symbols = set(symbols)
+        known = set(self.symbols)
+        with self._lock:
+            self._subscribers.append((symbols, callback))
+        if self._started and self.streaming and not symbols <= known:
+            self.restart_stream()
+        if callback:
+            for symbol in symbols:
+                ticker = self.tickers.get(symbol)
+                if ticker:
+                    callback(symbol, ticker)
+        return self
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            # Equality rather than identity, so a bound method unsubscribes too
+            self._subscribers = [entry for entry in self._subscribers if entry[1] != callback]
+
+    def latest(self, symbol):
+        """Latest ticker for a symbol, or None if missing or stale"""
+        return self.tickers.get(symbol)
+
+    def publish(self, symbol, ticker):
+        self.tickers.set(symbol, ticker)
+        with self._lock:
+            callbacks = [callback for symbols, callback in self._subscribers if callback and symbol in symbols]
+        for callback in callbacks:
+            try:
+                callback(symbol, ticker)
+            except Exception as e:
+                logging.error(f"Error publishing {symbol} ticker to a subscriber: {str(e)}")
+
+    def restart_stream(self):
+        """(Re)open the websocket for the current symbol set"""
+        if self._stream:
+            self._stream.stop()
+        symbols = self.symbols
+        self._stream = TickerStream(symbols, on_ticker=self.publish).start() if symbols else None
+
+    def poll(self):
+        """Fetch every symbol the stream isn't covering in one bulk request"""
+        due = [symbol for symbol in self.symbols if not (self._stream and self._stream.latest(symbol))]
+        if not due:
+            return
+        try:
+            self.exchange.load_markets()
+            ids = [self.exchange.market_id(symbol) for symbol in due]
+            tickers = self.exchange.fetch_tickers(due, {'symbols': json.dumps(ids, separators=(',', ':'))})
+        except Exception as e:
+            logging.error(f"Error polling tickers for {due}: {str(e)}")
+            return
+        for symbol in due:
+            ticker = tickers.get(symbol)
+            if ticker and ticker.get('last') is not None:
+                self.publish(symbol, {
+                    'price': ticker['last'],
+                    'volume_24h': ticker['quoteVolume'],
+                    'change_24h': ticker['percentage']
+                })
+
+    def run(self):
+        while True:
+            started = time.monotonic()
+            self.poll()
+            time.sleep(max(0, self.poll_interval - (time.monotonic() - started)))
+
+    def start(self):
+        self._started = True
+        if self.streaming:
+            self.restart_stream()
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+class SocketSubscriber:
+    """A process subscribed over the socket. The core's publish only queues its
+    tickers and a writer thread sends them, so a slow subscriber never holds up
+    the core; one that falls SUBSCRIBER_QUEUE_SIZE behind or fails a send is dropped."""
+
+    def __init__(self, core, conn, max_pending=SUBSCRIBER_QUEUE_SIZE):
+        self.core = core
+        self.conn = conn
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.closed = False
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def send(self, symbol, ticker):
+        try:
+            self.pending.put_nowait((symbol, ticker))
+        except queue.Full:
+            self.close(f"fell {self.pending.maxsize} tickers behind")
+
+    def run(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            symbol, ticker = item
+            try:
+                self.conn.sendall(json.dumps({'symbol': symbol, 'ticker': ticker}).encode() + b'\n')
+            except Exception as e:
+                self.close(f"send failed: {str(e)}")
+                return
+
+    def close(self, reason=None):
+        """Stop delivering to this subscriber and hang up on it"""
+        if self.closed:
+            return
+        self.closed = True
+        self.core.unsubscribe(self.send)
+        if reason:
+            logging.error(f"Dropping ingestion subscriber: {reason}")
+        try:
+            self.pending.put_nowait(None)
+        except queue.Full:
+            pass  # The writer's next send fails on the closed socket instead
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+class PubSubServer:
+    """Serves a core's tickers to other processes over a Unix socket, as JSON lines.
+
+    A subscriber sends ``{"subscribe": [symbols], "streaming": bool}`` and
+    then receives ``{"symbol": ..., "ticker": {...}}`` for each of them,
+    starting with the latest known ones.
+    """
+
+    def __init__(self, core, path=INGESTION_SOCKET):
+        self.core = core
+        self.path = path
+
+    def start(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if os.path.exists(self.path):
+            # Left behind by a core that died; we hold the lock so nobody else serves it
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        self._sock.listen()
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+        logging.info(f"Serving ingested tickers on {self.path}")
+        return self
+
+    def accept_loop(self):
+        while True:
+            conn, _ = self._sock.accept()
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        subscriber = SocketSubscriber(self.core, conn)
+        buffer = b''
+        try:
+            while True:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    break
+                buffer += chunk
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    request = json.loads(line)
+                    symbols = request.get('subscribe', [])
+                    logging.info(f"Ingestion subscriber added for {symbols}")
+                    warn_mode_mismatch(self.core, request.get('streaming'))
+                    self.core.subscribe(symbols, subscriber.send)
+        except Exception as e:
+            logging.error(f"Ingestion subscriber error: {str(e)}")
+        finally:
+            subscriber.close()
+            conn.close()
+
+class IngestionClient:
+    """Tickers from a core in another process, with TickerStream's latest() interface.
+
+    Whenever the core goes away the client tries to take the ingestion lock
+    and become the core itself, with its own exchange client and streaming
+    mode; otherwise it reconnects with exponential backoff, and until the
+    core is back latest() goes stale and callers fall back to their own polling.
+    """
+
+    def __init__(self, symbols, on_ticker=None, path=INGESTION_SOCKET, exchange=None, streaming=False):
+        self.symbols = list(symbols)
+        self.on_ticker = on_ticker
+        self.path = path
+        self.exchange = exchange
+        self.streaming = streaming
+        self.tickers = LatestTickers()
+        self.connected = False
+        # The core this client started after taking over, if it did
+        self.core = None
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def latest(self, symbol):
+        if self.core:
+            return self.core.latest(symbol)
+        return self.tickers.get(symbol)
+
+    def promote(self):
+        """Become the core if the lock is free, returning whether we did"""
+        if not core_lock.try_acquire():
+            return False
+        logging.warning(f"Ingestion core at {self.path} is gone, taking over as the core")
+        self.core = start_core(self.symbols, self.on_ticker, self.exchange, self.streaming)
+        return True
+
+    def run(self):
+        delay = 1
+        while True:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+                    conn.connect(self.path)
+                    conn.sendall(json.dumps({'subscribe': self.symbols, 'streaming': self.streaming}).encode() + b'\n')
+                    self.connected = True
+                    delay = 1
+                    logging.info(f"Subscribed to ingestion core at {self.path} for {self.symbols}")
+                    for line in conn.makefile('rb'):
+                        message = json.loads(line)
+                        self.tickers.set(message['symbol'], message['ticker'])
+                        if self.on_ticker:
+                            self.on_ticker(message['symbol'], message['ticker'])
+                raise ConnectionError("Ingestion core closed the connection")
+            except Exception as e:
+                logging.error(f"Ingestion client error: {str(e)}")
+            self.connected = False
+            if self.promote():
+                return
+            logging.info(f"Reconnecting to the ingestion core in {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_DELAY_MAX)
+
+# The core this process runs, if it won the ingestion lock
+core = None
+core_lock = LeaderLock(INGESTION_SOCKET + '.lock')
+
+def warn_mode_mismatch(core, streaming):
+    """A subscriber asking for another streaming mode gets the core's, so say so"""
+    if streaming is not None and bool(streaming) != core.streaming:
+        logging.warning(
+            f"Ingestion subscriber asked for streaming={bool(streaming)} but the core "
+            f"runs with streaming={core.streaming}; it gets the core's tickers"
+        )
+
+def start_core(symbols, on_ticker=None, exchange=None, streaming=False):
+    """Run the core in this process, which holds core_lock, and serve it on the socket"""
+    global core
+    if core is None:
+        core = IngestionCore(exchange, streaming)
+        core.subscribe(symbols, on_ticker)
+        PubSubServer(core).start()
+        return core.start()
+    warn_mode_mismatch(core, streaming)
+    return core.subscribe(symbols, on_ticker)
+
+def attach(symbols, on_ticker=None, exchange=None, streaming=False):
+    """Subscribe to the shared ingestion core and return a feed with latest(symbol).
+
+    The first process to take the lock next to INGESTION_SOCKET runs the
+    core (with this exchange client) and serves the socket; every other
+    process subscribes to it over the socket, and takes over if it goes away.
+    """
+    if core is None and not core_lock.try_acquire():
+        return IngestionClient(symbols, on_ticker, exchange=exchange, streaming=streaming).start()
+    return start_core(symbols, on_ticker, exchange, streaming)
+
+if __name__ == '__main__':
+    # Standalone core: collects whatever its subscribers ask for
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    symbols = [s.strip() for s in os.getenv('INGESTION_SYMBOLS', '').split(',') if s.strip()]
+    attach(symbols, streaming=os.getenv('STREAMING_MODE', 'false').lower() == 'true')
+    if core is None:
+        raise SystemExit(f"Another process already runs the ingestion core on {INGESTION_SOCKET}")
+    while True:
+        time.sleep(60)
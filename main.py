@@ -1,15 +1,27 @@
 import os
 import time
-import ccxt
 import pandas as pd
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import datetime
 from dotenv import load_dotenv
-import schedule
 import logging
-import requests
+import http_client
+from snapshot_store import atomic_write
+from detection import (
+    Alert, DetectionEngine, HolderConcentration, HolderGrowth, VolumeSurge, VolumeZScore, VWAPDivergence,
+    enabled_detectors, sinks_from_env
+)
+from streaming import TickerStream
+import ingestion
+from scheduler import Scheduler
 from solana.rpc.api import Client
+from solana.rpc.types import TokenAccountOpts
 from solders.pubkey import Pubkey
 import base58
+import json
+from collections import OrderedDict
+from solders.signature import Signature
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(
@@ -24,68 +36,372 @@ logging.basicConfig(
 # Load environment variables
 load_dotenv()
 
+class AccumulationScanner:
+    """Rolling volume windows for many pairs, kept in one 2-D array.
+
+    Each row is a pair and each column one tracking period, written as a
+    ring so the whole universe is analyzed in a single vectorized pass.
+    """
+
+    def __init__(self, periods=12):
+        self.periods = periods
+        self.symbols = []
+        self.rows = {}
+        self.volumes = np.full((0, periods), np.nan)
+        self.prices = np.full(0, np.nan)
+        self._column = 0
+        self._filled = 0
+
+    def _add_symbols(self, symbols):
+        for symbol in symbols:
+            self.rows[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        self.volumes = np.vstack([self.volumes, np.full((len(symbols), self.periods), np.nan)])
+        self.prices = np.concatenate([self.prices, np.full(len(symbols), np.nan)])
+
+    def update(self, tickers):
+        """Record one period of tickers; pairs missing this period get NaN"""
+        new_symbols = [symbol for symbol in tickers if symbol not in self.rows]
+        if new_symbols:
+            self._add_symbols(new_symbols)
+
+        volumes = np.full(len(self.symbols), np.nan)
+        for symbol, ticker in tickers.items():
+            row = self.rows[symbol]
+            if ticker.get('quoteVolume'):
+                volumes[row] = ticker['quoteVolume']
+            if ticker.get('last'):
+                self.prices[row] = ticker['last']
+        volumes[volumes <= 0] = np.nan
+
+        self.volumes[:, self._column] = volumes
+        self._column = (self._column + 1) % self.periods
+        self._filled = min(self._filled + 1, self.periods)
+
+    def analyze(self, accumulation_threshold, volume_threshold):
+        """Pairs whose recent volume rose past both thresholds.
+
+        Compares the last half of the window with the half before it, like
+        the VolumeSurge detector does for one pair.
+        """
+        # Until both halves are filled the comparison is against a partial window
+        half = self.periods // 2
+        if self._filled < 2 * half:
+            return []
+
+        # Columns ordered oldest to newest
+        order = (self._column + np.arange(self.periods)) % self.periods
+        window = self.volumes[:, order[-self._filled:]]
+        recent_volume = np.nansum(window[:, -half:], axis=1)
+        previous_volume = np.nansum(window[:, -2 * half:-half], axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_increase = np.where(
+                previous_volume > 0,
+                (recent_volume - previous_volume) / previous_volume * 100,
+                0
+            )
+        # Pairs with gaps (new listings, missed tickers) would compare unequal spans
+        complete = ~np.isnan(window[:, -2 * half:]).any(axis=1)
+        accumulating = (
+            complete &
+            (previous_volume > 0) &
+            (volume_increase > accumulation_threshold) &
+            (recent_volume > volume_threshold)
+        )
+        return [
+            (self.symbols[row], float(volume_increase[row]), float(self.prices[row]))
+            for row in np.flatnonzero(accumulating)
+        ]
+
 class CryptoAccumulationTracker:
     def __init__(self):
-        self.exchange = ccxt.binance({
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'spot'
-            }
-        })
+        self.exchange = ingestion.create_exchange()
         
         # Initialize Solana client
-        self.solana_client = Client("https://api.mainnet-beta.solana.com")
+        self.solana_rpc_url = os.getenv('SOLANA_RPC_URL', "https://api.mainnet-beta.solana.com")
+        self.solana_client = Client(self.solana_rpc_url, timeout=http_client.READ_TIMEOUT)
+
+        # Batched RPC settings: calls per JSON-RPC batch, batches in flight at once
+        self.rpc_batch_size = int(os.getenv('SOLANA_RPC_BATCH_SIZE', 50))
+        self.rpc_concurrency = int(os.getenv('SOLANA_RPC_CONCURRENCY', 4))
         
         # Load configuration
         self.crypto_pair = os.getenv('CRYPTO_PAIR', 'BTC/USDT')
         self.volume_threshold = float(os.getenv('VOLUME_THRESHOLD', 100000))
         self.accumulation_threshold = float(os.getenv('ACCUMULATION_THRESHOLD', 50))
+        self.tracking_interval = int(os.getenv('TRACKING_INTERVAL', 5))
+        self.solana_tracking_interval = int(os.getenv('SOLANA_TRACKING_INTERVAL', self.tracking_interval))
+
+        # Scanner mode configuration (all pairs quoted in SCAN_QUOTE unless SCAN_SYMBOLS is set)
+        self.scan_quote = os.getenv('SCAN_QUOTE', 'USDT')
+        self.scan_symbols = [s.strip() for s in os.getenv('SCAN_SYMBOLS', '').split(',') if s.strip()]
         
         # Solana token configuration
         self.solana_token_address = "jjwkEZufZa7LKuMb9NMP5QtVKy2E26sVJSM96c1XGFM"
         self.token_pubkey = Pubkey.from_string(self.solana_token_address)
         
-        # Initialize data storage
-        self.volume_history = []
-        self.price_history = []
+        # Streaming detectors fed every market and holder sample, windows bounded to 24 hours
+        self.detection = DetectionEngine(enabled_detectors([
+            VolumeSurge(
+                self.accumulation_threshold,
+                self.volume_threshold,
+                capacity=24 * 60 // self.tracking_interval + 1
+            ),
+            VolumeZScore(
+                alpha=float(os.getenv('EWMA_ALPHA', 0.1)),
+                threshold=float(os.getenv('VOLUME_ZSCORE_THRESHOLD', 3))
+            ),
+            VWAPDivergence(
+                alpha=float(os.getenv('EWMA_ALPHA', 0.1)),
+                threshold=float(os.getenv('VWAP_DIVERGENCE_THRESHOLD', 5))
+            ),
+            HolderGrowth(self.accumulation_threshold, self.volume_threshold),
+            HolderConcentration(
+                top_n=int(os.getenv('HOLDER_CONCENTRATION_TOP', 10)),
+                threshold=float(os.getenv('HOLDER_CONCENTRATION_THRESHOLD', 2))
+            )
+        ]), sinks_from_env())
         self.token_holders = {}
-        
+
+        # Warm-start checkpoint of the detection state, so a restart doesn't reset it
+        self.checkpoint_path = os.getenv('TRACKER_CHECKPOINT_PATH', 'data/tracker_checkpoint.json')
+        self.load_checkpoint()
+
+        # Streaming mode: websocket ticker for the tracked pair, REST polling as fallback.
+        # With shared ingestion the ticker comes from the core the web app also uses.
+        # Each tick goes straight to the detectors, so they start after them.
+        self.ticker_stream = None
+        streaming = os.getenv('STREAMING_MODE', 'false').lower() == 'true'
+        if os.getenv('INGESTION_MODE', 'off').lower() == 'shared':
+            self.ticker_stream = ingestion.attach(
+                [self.crypto_pair],
+                on_ticker=self.on_ticker,
+                exchange=self.exchange,
+                streaming=streaming
+            )
+        elif streaming:
+            self.ticker_stream = TickerStream([self.crypto_pair], on_ticker=self.on_ticker).start()
+
+        # Signature cursor and parsed transaction cache, persisted across restarts
+        self.solana_state_path = os.getenv('SOLANA_STATE_PATH', 'data/solana_state.json')
+        self.transaction_cache_size = int(os.getenv('SOLANA_TX_CACHE_SIZE', 5000))
+        self.newest_signature = None
+        self.oldest_signature = None
+        self.pending_signatures = []
+        self.transaction_cache = OrderedDict()  # signature -> transaction, newest first
+        self.load_solana_state()
+
+    def _post_rpc_batch(self, method, params_batch):
+        """Send one JSON-RPC batch request and return results in order."""
+        try:
+            payload = [
+                {'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+                for i, params in enumerate(params_batch)
+            ]
+            response = http_client.session.post(self.solana_rpc_url, json=payload)
+            response.raise_for_status()
+            results = {item['id']: item.get('result') for item in response.json()}
+            return [results.get(i) for i in range(len(params_batch))]
+        except Exception as e:
+            logging.error(f"Error in {method} batch of {len(params_batch)}: {str(e)}")
+            return [None] * len(params_batch)
+
+    def rpc_batch(self, method, params_list):
+        """Run many calls of one RPC method as concurrent JSON-RPC batches."""
+        batches = [
+            params_list[i:i + self.rpc_batch_size]
+            for i in range(0, len(params_list), self.rpc_batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=self.rpc_concurrency) as pool:
+            results = pool.map(lambda batch: self._post_rpc_batch(method, batch), batches)
+        return [result for batch_results in results for result in batch_results]
+
+    def fetch_holder_balances(self, pubkeys):
+        """Fetch parsed token balances with getMultipleAccounts, 100 accounts per call."""
+        chunks = [pubkeys[i:i + 100] for i in range(0, len(pubkeys), 100)]
+        results = self.rpc_batch('getMultipleAccounts', [
+            [[str(pubkey) for pubkey in chunk], {'encoding': 'jsonParsed'}]
+            for chunk in chunks
+        ])
+
+        holder_data = {}
+        for chunk, result in zip(chunks, results):
+            if not result:
+                continue
+            for pubkey, account in zip(chunk, result['value']):
+                if account and isinstance(account['data'], dict):
+                    token_amount = account['data']['parsed']['info']['tokenAmount']
+                    holder_data[str(pubkey)] = {
+                        'balance': int(token_amount['amount']),
+                        'decimals': token_amount['decimals']
+                    }
+        return holder_data
+
+    def fetch_transactions(self, signatures):
+        """Fetch transactions for the given signatures as batched getTransaction calls."""
+        results = self.rpc_batch('getTransaction', [
+            [str(signature), {'encoding': 'jsonParsed', 'maxSupportedTransactionVersion': 0}]
+            for signature in signatures
+        ])
+
+        transactions = []
+        for signature, tx in zip(signatures, results):
+            if tx and tx.get('meta'):
+                transactions.append({
+                    'timestamp': tx['blockTime'],
+                    'signature': str(signature),
+                    'amount': tx['meta']['postBalances'][0] - tx['meta']['preBalances'][0]
+                })
+        return transactions
+
+    def load_solana_state(self):
+        """Restore the signature cursor and transaction cache from disk."""
+        try:
+            with open(self.solana_state_path) as f:
+                state = json.load(f)
+            self.newest_signature = state.get('newest_signature')
+            self.oldest_signature = state.get('oldest_signature')
+            self.pending_signatures = state.get('pending_signatures', [])
+            self.transaction_cache = OrderedDict(
+                (tx['signature'], tx) for tx in state.get('transactions', [])
+            )
+            logging.info(
+                f"Loaded Solana state: {len(self.transaction_cache)} cached transactions, "
+                f"cursor {self.newest_signature}"
+            )
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"Error loading Solana state: {str(e)}")
+
+    def save_solana_state(self):
+        """Persist the signature cursor and transaction cache atomically."""
+        try:
+            atomic_write(self.solana_state_path, json.dumps({
+                'newest_signature': self.newest_signature,
+                'oldest_signature': self.oldest_signature,
+                'pending_signatures': self.pending_signatures,
+                'transactions': list(self.transaction_cache.values())
+            }).encode())
+        except Exception as e:
+            logging.error(f"Error saving Solana state: {str(e)}")
+
+    def load_checkpoint(self):
+        """Restore the detector state saved before a restart."""
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            self.detection.load_state(checkpoint.get('detectors', {}))
+            logging.info(f"Loaded tracker checkpoint saved {time.time() - checkpoint['saved_at']:.0f}s ago")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"Error loading tracker checkpoint: {str(e)}")
+
+    def save_checkpoint(self):
+        """Persist the detector state atomically."""
+        try:
+            atomic_write(self.checkpoint_path, json.dumps({
+                'saved_at': time.time(),
+                'detectors': self.detection.state()
+            }, separators=(',', ':')).encode())
+        except Exception as e:
+            logging.error(f"Error saving tracker checkpoint: {str(e)}")
+
+    def fetch_signature_pages(self, before=None, until=None, max_pages=None):
+        """Page through signatures newest first, between the before/until cursors."""
+        signatures = []
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            page = self.solana_client.get_signatures_for_address(
+                self.token_pubkey,
+                before=Signature.from_string(before) if before else None,
+                until=Signature.from_string(until) if until else None,
+                limit=1000
+            ).value
+            pages += 1
+            signatures.extend(str(sig.signature) for sig in page)
+            if len(page) < 1000:
+                break
+            before = signatures[-1]
+        return signatures
+
+    def cache_transactions(self, signatures, newest=True):
+        """Fetch and cache transactions, returning signatures that could not be fetched."""
+        if not signatures:
+            return []
+        fetched = {tx['signature']: tx for tx in self.fetch_transactions(signatures)}
+        ordered = [(sig, fetched[sig]) for sig in signatures if sig in fetched]
+        cached = list(self.transaction_cache.items())
+        merged = ordered + cached if newest else cached + ordered
+        # Retried signatures can be older than cached ones, so keep the cache newest first by
+        # block time; the sort is stable, so same-block transactions keep their signature order
+        self.transaction_cache = OrderedDict(
+            sorted(merged, key=lambda item: item[1]['timestamp'] or 0, reverse=True)
+        )
+        while len(self.transaction_cache) > self.transaction_cache_size:
+            self.transaction_cache.popitem(last=True)
+        return [sig for sig in signatures if sig not in fetched]
+
+    def ingest_new_transactions(self):
+        """Fetch only transactions newer than the saved cursor (plus earlier failures)."""
+        # Without a cursor, start from the latest page only; older history is backfill
+        new_signatures = self.fetch_signature_pages(
+            until=self.newest_signature,
+            max_pages=None if self.newest_signature else 1
+        )
+        retry = [sig for sig in self.pending_signatures if sig not in self.transaction_cache]
+        self.pending_signatures = self.cache_transactions(new_signatures + retry)[:self.transaction_cache_size]
+
+        if new_signatures:
+            self.newest_signature = new_signatures[0]
+            if not self.oldest_signature:
+                self.oldest_signature = new_signatures[-1]
+        self.save_solana_state()
+        logging.info(
+            f"Ingested {len(new_signatures)} new Solana transactions, "
+            f"{len(self.pending_signatures)} pending retry"
+        )
+
+    def backfill_transactions(self, pages=1):
+        """Explicitly page through signatures older than anything ingested so far."""
+        # Backfilled transactions are the oldest, so a full cache would evict them on arrival
+        room = self.transaction_cache_size - len(self.transaction_cache)
+        if room <= 0:
+            logging.info("Solana transaction cache is full, skipping backfill")
+            return
+        older = self.fetch_signature_pages(before=self.oldest_signature, max_pages=pages)
+        if not older:
+            logging.info("Solana transaction backfill reached the start of history")
+            return
+        # Only advance the cursor past what actually fits, so the rest is backfilled later
+        older = older[:room]
+        self.pending_signatures += self.cache_transactions(older, newest=False)
+        self.oldest_signature = older[-1]
+        if not self.newest_signature:
+            self.newest_signature = older[0]
+        self.save_solana_state()
+        logging.info(f"Backfilled {len(older)} older Solana transactions")
+
     def fetch_solana_token_data(self):
         """Fetch Solana token data including holders and transactions."""
         try:
             # Get token account info
             token_accounts = self.solana_client.get_token_accounts_by_owner(
                 self.token_pubkey,
-                {"programId": Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")}
+                TokenAccountOpts(program_id=Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"))
             )
             
-            # Get recent transactions
-            signatures = self.solana_client.get_signatures_for_address(self.token_pubkey)
-            
-            # Process holder data
-            holder_data = {}
-            for account in token_accounts.value:
-                account_info = self.solana_client.get_account_info(account.pubkey)
-                if account_info.value:
-                    holder_data[account.pubkey] = {
-                        'balance': account_info.value.data.parsed['info']['tokenAmount']['amount'],
-                        'decimals': account_info.value.data.parsed['info']['tokenAmount']['decimals']
-                    }
-            
-            # Process transaction data
-            recent_transactions = []
-            for sig in signatures.value:
-                tx = self.solana_client.get_transaction(sig.signature)
-                if tx.value:
-                    recent_transactions.append({
-                        'timestamp': tx.value.block_time,
-                        'signature': sig.signature,
-                        'amount': tx.value.meta.post_balances[0] - tx.value.meta.pre_balances[0]
-                    })
-            
+            # Holder balances are fetched in batches rather than one call each
+            holder_data = self.fetch_holder_balances([account.pubkey for account in token_accounts.value])
+
+            # Only transactions newer than the cursor hit the RPC, the rest come from cache
+            self.ingest_new_transactions()
+
             return {
                 'holders': holder_data,
-                'transactions': recent_transactions,
+                'transactions': list(self.transaction_cache.values()),
                 'timestamp': datetime.now()
             }
             
@@ -93,141 +409,161 @@ class CryptoAccumulationTracker:
             logging.error(f"Error fetching Solana token data: {str(e)}")
             return None
 
-    def analyze_solana_accumulation(self, token_data):
-        """Analyze Solana token accumulation patterns."""
-        if not token_data:
-            return False, 0
-
-        # Calculate total holder value
-        total_holder_value = sum(
-            holder['balance'] / (10 ** holder['decimals'])
-            for holder in token_data['holders'].values()
-        )
-
-        # Calculate recent transaction volume
-        recent_transactions = token_data['transactions'][:10]  # Last 10 transactions
-        transaction_volume = sum(abs(tx['amount']) for tx in recent_transactions)
-
-        # Compare with previous data
-        if hasattr(self, 'previous_holder_value'):
-            holder_increase = ((total_holder_value - self.previous_holder_value) / self.previous_holder_value) * 100
-        else:
-            holder_increase = 0
-
-        self.previous_holder_value = total_holder_value
-
-        # Check for accumulation conditions
-        is_accumulating = (
-            holder_increase > self.accumulation_threshold and
-            transaction_volume > self.volume_threshold
-        )
-
-        return is_accumulating, holder_increase
-
     def fetch_market_data(self):
         """Fetch current market data for the specified pair."""
         try:
+            streamed = self.ticker_stream.latest(self.crypto_pair) if self.ticker_stream else None
+            if streamed:
+                return {
+                    'timestamp': datetime.now(),
+                    'price': streamed['price'],
+                    'volume': streamed['volume_24h'],
+                    'change_24h': streamed['change_24h'],
+                    'streamed': True
+                }
             ticker = self.exchange.fetch_ticker(self.crypto_pair)
             return {
                 'timestamp': datetime.now(),
                 'price': ticker['last'],
                 'volume': ticker['quoteVolume'],
-                'change_24h': ticker['percentage']
+                'change_24h': ticker['percentage'],
+                'streamed': False
             }
         except Exception as e:
             logging.error(f"Error fetching market data: {str(e)}")
             return None
 
-    def analyze_accumulation(self, current_data):
-        """Analyze if there's significant accumulation happening."""
-        if not current_data:
-            return False, 0
-
-        # Add current data to history
-        self.volume_history.append(current_data['volume'])
-        self.price_history.append(current_data['price'])
+    def on_ticker(self, symbol, ticker):
+        """Run the market detectors on each streamed tick as it arrives."""
+        self.detection.process({
+            'kind': 'market',
+            'subject': symbol,
+            'timestamp': time.time(),
+            'price': ticker['price'],
+            'volume': ticker['volume_24h']
+        })
 
-        # Keep only last 24 hours of data
-        cutoff_time = datetime.now() - timedelta(hours=24)
-        self.volume_history = [v for v in self.volume_history if v > 0]
-        self.price_history = [p for p in self.price_history if p > 0]
+    def track_market(self):
+        """Fetch and analyze the tracked pair once."""
+        current_data = self.fetch_market_data()
+        if current_data:
+            # Streamed ticks were already fed to the detectors by on_ticker
+            if not current_data['streamed']:
+                self.detection.process({
+                    'kind': 'market',
+                    'subject': self.crypto_pair,
+                    'timestamp': current_data['timestamp'].timestamp(),
+                    'price': current_data['price'],
+                    'volume': current_data['volume']
+                })
 
-        if len(self.volume_history) < 2:
-            return False, 0
+            logging.info(
+                f"Status for {self.crypto_pair}: "
+                f"Price: {current_data['price']:.2f}, "
+                f"24h Change: {current_data['change_24h']:.2f}%"
+            )
+            self.save_checkpoint()
+        http_client.log_provider_stats()
 
-        # Calculate volume increase
-        recent_volume = sum(self.volume_history[-6:])  # Last 6 periods
-        previous_volume = sum(self.volume_history[-12:-6])  # Previous 6 periods
-        
-        if previous_volume == 0:
-            return False, 0
+    def track_solana(self):
+        """Fetch and analyze the Solana token once."""
+        token_data = self.fetch_solana_token_data()
+        if token_data:
+            balances = {
+                owner: holder['balance'] / (10 ** holder['decimals'])
+                for owner, holder in token_data['holders'].items()
+            }
+            recent_transactions = token_data['transactions'][:10]  # Last 10 transactions
+            alerts = self.detection.process({
+                'kind': 'holders',
+                'subject': self.solana_token_address,
+                'timestamp': token_data['timestamp'].timestamp(),
+                'balances': balances,
+                'transaction_volume': sum(abs(tx['amount']) for tx in recent_transactions)
+            })
 
-        volume_increase = ((recent_volume - previous_volume) / previous_volume) * 100
-        
-        # Check for accumulation conditions
-        is_accumulating = (
-            volume_increase > self.accumulation_threshold and
-            recent_volume > self.volume_threshold
-        )
+            logging.info(
+                f"Status for Solana token {self.solana_token_address}: "
+                f"Total holder value: {sum(balances.values()):.2f}, "
+                f"{len(balances)} holders, {len(alerts)} alerts"
+            )
+            self.save_checkpoint()
 
-        return is_accumulating, volume_increase
-
-    def send_alert(self, volume_increase, is_solana=False):
-        """Send alert when significant accumulation is detected."""
-        if os.getenv('ENABLE_ALERTS', 'true').lower() == 'true':
-            if is_solana:
-                alert_message = (
-                    f"Significant accumulation detected for Solana token {self.solana_token_address}!\n"
-                    f"Holder value increase: {volume_increase:.2f}%\n"
-                    f"Total holder value: {self.previous_holder_value:.2f}"
-                )
-            else:
-                alert_message = (
-                    f"Significant accumulation detected for {self.crypto_pair}!\n"
-                    f"Volume increase: {volume_increase:.2f}%\n"
-                    f"Current price: {self.price_history[-1]:.2f}"
-                )
-            logging.info(alert_message)
-            # Add your preferred alert method here (email, telegram, etc.)
+    def throttled(self, *urls):
+        """Scheduler hook reporting whether a job's providers rate limited it."""
+        providers = [http_client.provider_for(url) for url in urls]
+        return lambda since: http_client.session.throttled_since(since, *providers)
 
     def run_tracking(self):
         """Main tracking loop."""
         logging.info(f"Starting tracking for {self.crypto_pair} and Solana token {self.solana_token_address}")
-        
-        while True:
+
+        backfill_pages = int(os.getenv('SOLANA_BACKFILL_PAGES', 0))
+        if backfill_pages:
             try:
-                # Track regular crypto pair
-                current_data = self.fetch_market_data()
-                if current_data:
-                    is_accumulating, volume_increase = self.analyze_accumulation(current_data)
-                    if is_accumulating:
-                        self.send_alert(volume_increase)
-                    
-                    logging.info(
-                        f"Status for {self.crypto_pair}: "
-                        f"Price: {current_data['price']:.2f}, "
-                        f"24h Change: {current_data['change_24h']:.2f}%"
-                    )
-
-                # Track Solana token
-                token_data = self.fetch_solana_token_data()
-                if token_data:
-                    is_accumulating, holder_increase = self.analyze_solana_accumulation(token_data)
-                    if is_accumulating:
-                        self.send_alert(holder_increase, is_solana=True)
-                    
-                    logging.info(
-                        f"Status for Solana token {self.solana_token_address}: "
-                        f"Total holder value: {self.previous_holder_value:.2f}, "
-                        f"Holder increase: {holder_increase:.2f}%"
-                    )
-                
-                time.sleep(int(os.getenv('TRACKING_INTERVAL', 5)) * 60)  # Convert minutes to seconds
-                
+                self.backfill_transactions(backfill_pages)
             except Exception as e:
-                logging.error(f"Error in tracking loop: {str(e)}")
-                time.sleep(60)  # Wait a minute before retrying
+                logging.error(f"Error backfilling Solana transactions: {str(e)}")
+
+        scheduler = Scheduler()
+        scheduler.add(
+            'market',
+            self.track_market,
+            self.tracking_interval * 60,  # Convert minutes to seconds
+            throttled=self.throttled('https://api.binance.com')
+        )
+        scheduler.add(
+            'solana',
+            self.track_solana,
+            self.solana_tracking_interval * 60,
+            throttled=self.throttled(self.solana_rpc_url)
+        )
+        scheduler.run_forever()
+
+    def fetch_scan_tickers(self):
+        """Fetch tickers for every scanned pair in one bulk request."""
+        try:
+            tickers = self.exchange.fetch_tickers(self.scan_symbols or None)
+            return {
+                symbol: ticker for symbol, ticker in tickers.items()
+                if self.scan_symbols or symbol.endswith(f"/{self.scan_quote}")
+            }
+        except Exception as e:
+            logging.error(f"Error fetching tickers: {str(e)}")
+            return None
+
+    def scan(self, scanner):
+        """Fetch every scanned pair once and alert on the ones accumulating."""
+        tickers = self.fetch_scan_tickers()
+        if tickers:
+            scanner.update(tickers)
+            alerts = scanner.analyze(self.accumulation_threshold, self.volume_threshold)
+            for symbol, volume_increase, price in alerts:
+                self.detection.publish(Alert('volume_surge', symbol, time.time(), volume_increase, (
+                    f"Significant accumulation detected for {symbol}!\n"
+                    f"Volume increase: {volume_increase:.2f}%\n"
+                    f"Current price: {price:.2f}"
+                )))
+
+            logging.info(f"Scanned {len(tickers)} pairs, {len(alerts)} accumulating")
+
+    def run_scanner(self):
+        """Scan every pair for accumulation, one bulk ticker fetch per interval."""
+        scanner = AccumulationScanner()
+        logging.info(f"Starting accumulation scanner for {len(self.scan_symbols) or 'all'} {self.scan_quote} pairs")
+
+        scheduler = Scheduler()
+        scheduler.add(
+            'scan',
+            lambda: self.scan(scanner),
+            self.tracking_interval * 60,
+            throttled=self.throttled('https://api.binance.com')
+        )
+        scheduler.run_forever()
 
 if __name__ == "__main__":
     tracker = CryptoAccumulationTracker()
-    tracker.run_tracking() 
\ No newline at end of file
+    if os.getenv('SCAN_MODE', 'false').lower() == 'true':
+        tracker.run_scanner()
+    else:
+        tracker.run_tracking() 
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""Incremental market data sync over a large coin universe, one page at a time"""
+import math
+import time
+import logging
+import threading
+
+from coin_index import CoinIndex
+
+# Fields the table keeps per coin, as served to clients
+COIN_FIELDS = (
+    'id', 'symbol', 'name', 'image', 'current_price', 'market_cap',
+    'market_cap_rank', 'price_change_percentage_24h', 'total_volume'
+)
+
+def format_coin(coin):
+    """Keep only the fields clients use, with the symbol upper-cased"""
+    formatted = {field: coin.get(field) for field in COIN_FIELDS}
+    formatted['symbol'] = (coin.get('symbol') or '').upper()
+    return formatted
+
+class MarketTable:
+    """Latest market data per coin id, filled page by page.
+
+    A synced page is authoritative for its rank range: coins that were on
+    the page last time but are missing now have moved to another page and
+    are dropped until that page syncs. Queries go through a CoinIndex that
+    is updated with each coin as its page syncs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._coins = {}
+        self._pages = {}        # coin id -> page it was last seen on
+        self._synced_at = {}    # page -> wall-clock time it was last synced
+        self._stale = set()     # pages restored from a checkpoint and not synced since
+        self.index = CoinIndex()
+
+    def __len__(self):
+        return len(self._coins)
+
+    def upsert_page(self, page, coins, synced_at=None):
+        synced_at = synced_at or time.time()
+        with self._lock:
+            ids = {coin['id'] for coin in coins}
+            for coin_id in [coin_id for coin_id, on_page in self._pages.items() if on_page == page and coin_id not in ids]:
+                del self._coins[coin_id]
+                del self._pages[coin_id]
+                self.index.remove(coin_id)
+            for coin in coins:
+                if self._coins.get(coin['id']) != coin:
+                    self.index.update(coin)
+                self._coins[coin['id']] = coin
+                self._pages[coin['id']] = page
+            self._synced_at[page] = synced_at
+            self._stale.discard(page)
+
+    @property
+    def stale(self):
+        """Whether any page still holds data restored from a checkpoint"""
+        return bool(self._stale)
+
+    def get(self, coin_id):
+        with self._lock:
+            return self._coins.get(coin_id)
+
+    def synced_at(self, coin_id):
+        """When the page holding a coin was last synced, or None"""
+        with self._lock:
+            page = self._pages.get(coin_id)
+            return self._synced_at.get(page)
+
+    def page_age(self, page):
+        """Seconds since a page was last synced, or None if never"""
+        with self._lock:
+            synced_at = self._synced_at.get(page)
+        return time.time() - synced_at if synced_at else None
+
+    def page_coins(self, page):
+        with self._lock:
+            return [coin for coin_id, coin in self._coins.items() if self._pages[coin_id] == page]
+
+    def top(self, count):
+        """The highest ranked coins, best first"""
+        return self.query(sort='market_cap_rank', per_page=count)[1]
+
+    def query(self, sort='market_cap_rank', descending=False, ranges=None, prefix=None, page=1, per_page=50):
+        """Total matches and one page of coins, sorted, range-filtered and prefix-searched"""
+        with self._lock:
+            total, ids = self.index.query(sort, descending, ranges, prefix, (page - 1) * per_page, per_page)
+            return total, [self._coins[coin_id] for coin_id in ids]
+
+    def dump(self):
+        """Rows and page sync times, for sharing with other workers"""
+        with self._lock:
+            return {
+                'pages': {str(page): synced_at for page, synced_at in self._synced_at.items()},
+                'stale': sorted(self._stale),
+                'coins': [dict(coin, page=self._pages[coin_id]) for coin_id, coin in self._coins.items()]
+            }
+
+    def load(self, data, stale=False):
+        """Replace the table with a dump from another worker, or with a
+        checkpoint (``stale``) whose pages stay marked until they sync again"""
+        with self._lock:
+            self._coins = {}
+            self._pages = {}
+            self.index = CoinIndex()
+            for row in data.get('coins', []):
+                row = dict(row)
+                self._pages[row['id']] = row.pop('page')
+                self._coins[row['id']] = row
+                self.index.update(row)
+            self._synced_at = {int(page): synced_at for page, synced_at in data.get('pages', {}).items()}
+            self._stale = set(self._synced_at) if stale else set(data.get('stale', []))
+
+class MarketSync:
+    """Keeps a MarketTable covering the top ``universe`` coins fresh while
+    fetching only ``pages_per_cycle`` pages per cycle.
+
+    Each cycle syncs the pages with the highest priority: how long since
+    the page was synced, weighted towards top ranks (1 / page) and towards
+    volatile pages (mean absolute 24h change of the coins on them). Pages
+    never synced go first. Upstream calls per cycle stay fixed however
+    large the universe is.
+    """
+
+    def __init__(self, fetch_page, table, universe=1000, page_size=250, pages_per_cycle=1):
+        self.fetch_page = fetch_page
+        self.table = table
+        self.universe = universe
+        self.page_size = page_size
+        self.pages_per_cycle = pages_per_cycle
+
+    @property
+    def page_count(self):
+        return math.ceil(self.universe / self.page_size)
+
+    def volatility(self, page):
+        changes = [
+            abs(coin['price_change_percentage_24h']) for coin in self.table.page_coins(page)
+            if coin['price_change_percentage_24h'] is not None
+        ]
+        return sum(changes) / len(changes) if changes else 0
+
+    def priority(self, page):
+        age = self.table.page_age(page)
+        if age is None:
+            return math.inf
+        # A page moving 10% a day counts as twice as urgent as a flat one
+        return age / page * (1 + self.volatility(page) / 10)
+
+    def next_pages(self):
+        pages = range(1, self.page_count + 1)
+        # Ties (e.g. several never-synced pages) go to the best ranked page
+        return sorted(pages, key=lambda page: (-self.priority(page), page))[:self.pages_per_cycle]
+
+    def sync_cycle(self):
+        """Fetch the most urgent pages into the table; returns the pages synced"""
+        synced = []
+        for page in self.next_pages():
+            coins = self.fetch_page(page)
+            if not coins:
+                logging.error(f"Market page {page} fetch failed, keeping existing data")
+                continue
+            self.table.upsert_page(page, [format_coin(coin) for coin in coins])
+            synced.append(page)
+        logging.info(f"Synced market pages {synced}, {len(self.table)} coins in table")
+        return synced
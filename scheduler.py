@@ -0,0 +1,97 @@
+"""Drift-free job scheduler with jitter, overrun skipping and rate-limit backoff"""
+import time
+import random
+import logging
+import threading
+
+class Job:
+    def __init__(self, name, func, interval, jitter=0.1, throttled=None, max_backoff=8):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.throttled = throttled
+        self.max_backoff = max_backoff
+        self.backoff = 1
+        self.next_tick = None
+        self.running = False
+        self.runs = 0
+        self.skipped = 0
+
+    @property
+    def period(self):
+        return self.interval * self.backoff
+
+class Scheduler:
+    """Runs each job on its own fixed grid of ticks.
+
+    Ticks are computed from the start time rather than from when the last
+    run finished, so periods never drift. Each run starts up to
+    ``jitter * interval`` seconds after its tick. A tick that arrives while
+    the previous run is still going is skipped rather than overlapped. When
+    a job's ``throttled(started_at)`` hook reports rate limiting, its period
+    doubles (up to ``max_backoff`` times), then halves back after clean runs.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self._lock = threading.Lock()
+
+    def add(self, name, func, interval, jitter=0.1, throttled=None, max_backoff=8):
+        job = Job(name, func, interval, jitter, throttled, max_backoff)
+        self.jobs.append(job)
+        return job
+
+    def run_forever(self):
+        start = time.monotonic()
+        for job in self.jobs:
+            job.next_tick = start
+        logging.info(
+            "Scheduler started: " +
+            ", ".join(f"{job.name} every {job.interval}s" for job in self.jobs)
+        )
+        while True:
+            now = time.monotonic()
+            for job in self.jobs:
+                if now >= job.next_tick:
+                    self._dispatch(job, now)
+            time.sleep(max(0, min(job.next_tick for job in self.jobs) - time.monotonic()))
+
+    def _dispatch(self, job, now):
+        with self._lock:
+            if job.running:
+                job.skipped += 1
+                logging.warning(f"Job {job.name} still running, skipping this tick")
+            else:
+                job.running = True
+                threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        # Advance along the fixed grid, past any ticks that were missed
+        missed = int((now - job.next_tick) // job.period) + 1
+        job.next_tick += missed * job.period
+
+    def _run(self, job):
+        if job.jitter:
+            time.sleep(random.uniform(0, job.jitter * job.interval))
+        started_at = time.monotonic()
+        try:
+            job.func()
+            job.runs += 1
+        except Exception as e:
+            logging.error(f"Error in job {job.name}: {str(e)}")
+        finally:
+            self._adjust_backoff(job, started_at)
+            with self._lock:
+                job.running = False
+
+    def _adjust_backoff(self, job, started_at):
+        try:
+            throttled = job.throttled(started_at) if job.throttled else False
+        except Exception as e:
+            logging.error(f"Error checking throttling for job {job.name}: {str(e)}")
+            throttled = False
+        if throttled and job.backoff < job.max_backoff:
+            job.backoff *= 2
+            logging.warning(f"Job {job.name} rate limited, backing off to every {job.period}s")
+        elif not throttled and job.backoff > 1:
+            job.backoff //= 2
+            logging.info(f"Job {job.name} recovering, now every {job.period}s")
@@ -0,0 +1,82 @@
+"""Shared snapshot store and updater leader election across worker processes"""
+import os
+import json
+import fcntl
+import tempfile
+import logging
+
+def atomic_write(path, data):
+    """Write bytes to path so readers only ever see a complete file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+class LeaderLock:
+    """Non-blocking file lock held for the life of the process that wins it"""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    @property
+    def is_leader(self):
+        return self._fd is not None
+
+    def try_acquire(self):
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        logging.info(f"Process {os.getpid()} acquired leader lock {self.path}")
+        return True
+
+class SnapshotStore:
+    """Latest JSON snapshot shared through a file on local disk"""
+
+    def __init__(self, path):
+        self.path = path
+        self._last_mtime = None
+
+    def publish(self, body):
+        atomic_write(self.path, body)
+        self._last_mtime = os.stat(self.path).st_mtime_ns
+
+    def read(self):
+        """Load the stored snapshot, or None if there isn't one"""
+        try:
+            with open(self.path, 'rb') as f:
+                self._last_mtime = os.fstat(f.fileno()).st_mtime_ns
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logging.error(f"Error reading snapshot {self.path}: {str(e)}")
+            return None
+
+    def read_if_changed(self):
+        """Load the stored snapshot only if it changed since the last read"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime == self._last_mtime:
+            return None
+        return self.read()
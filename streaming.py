@@ -0,0 +1,96 @@
+"""Real-time exchange ticker streams over websockets"""
+import os
+import json
+import time
+import logging
+import threading
+
+import websocket
+
+BINANCE_WS_URL = os.getenv('BINANCE_WS_URL', 'wss://stream.binance.com:9443')
+# Seconds after the last frame before a symbol's streamed ticker counts as stale
+STREAM_STALE_AFTER = float(os.getenv('STREAM_STALE_AFTER', 10))
+RECONNECT_DELAY_MAX = 60
+
+class TickerStream:
+    """Subscribes to Binance 24h ticker streams for a set of ccxt-style symbols.
+
+    Keeps the latest ticker per symbol and calls ``on_ticker(symbol, ticker)``
+    for every frame. Reconnects with exponential backoff whenever the
+    connection drops.
+    """
+
+    def __init__(self, symbols, on_ticker=None, url=BINANCE_WS_URL, stale_after=STREAM_STALE_AFTER):
+        self.symbols = list(symbols)
+        self.on_ticker = on_ticker
+        self.url = url
+        self.stale_after = stale_after
+        self.connected = False
+        self._stream_ids = {symbol.replace('/', '').upper(): symbol for symbol in self.symbols}
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._stopped = False
+        self._ws = None
+
+    def stream_url(self):
+        streams = '/'.join(f"{stream_id.lower()}@ticker" for stream_id in self._stream_ids)
+        return f"{self.url}/stream?streams={streams}"
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        if self._ws:
+            self._ws.close()
+
+    def run(self):
+        delay = 1
+        while not self._stopped:
+            try:
+                logging.info(f"Connecting to ticker stream {self.stream_url()}")
+                self._ws = websocket.create_connection(self.stream_url(), timeout=30)
+                self.connected = True
+                delay = 1
+                while not self._stopped:
+                    self.handle_frame(self._ws.recv())
+            except Exception as e:
+                if not self._stopped:
+                    logging.error(f"Ticker stream error: {str(e)}, reconnecting in {delay}s")
+            finally:
+                self.connected = False
+                if self._ws:
+                    self._ws.close()
+            if not self._stopped:
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_DELAY_MAX)
+
+    def handle_frame(self, frame):
+        if not frame:
+            raise ConnectionError("Ticker stream closed")
+        message = json.loads(frame)
+        data = message.get('data', message)
+        if data.get('e') != '24hrTicker':
+            return
+        symbol = self._stream_ids.get(data['s'])
+        if not symbol:
+            return
+
+        ticker = {
+            'price': float(data['c']),
+            'volume_24h': float(data['q']),
+            'change_24h': float(data['P'])
+        }
+        with self._lock:
+            self._latest[symbol] = (ticker, time.monotonic())
+        if self.on_ticker:
+            self.on_ticker(symbol, ticker)
+
+    def latest(self, symbol):
+        """Latest streamed ticker for a symbol, or None if missing or stale"""
+        with self._lock:
+            entry = self._latest.get(symbol)
+        if not entry or time.monotonic() - entry[1] > self.stale_after:
+            return None
+        return entry[0]
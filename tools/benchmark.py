@@ -0,0 +1,298 @@
+"""Offline benchmarks for the updater, /api/data, Socket.IO broadcasts and the tracker.
+
+Starts tools/provider_server.py on a free port, points every provider URL at
+it and reports:
+
+- update: latency of each update job (solana, btc, markets) with a cold
+  provider cache, under each latency/failure scenario
+- api: /api/data requests per second per response variant, in-process
+- broadcast: cost of one broadcast_update as simulated Socket.IO clients
+  scale up (clients are registered with the server's room manager and
+  outgoing packets are counted instead of sent)
+- tracker: CryptoAccumulationTracker Solana cycle time against the number of
+  token holders and new signatures per cycle
+
+Run from the repository root: python tools/benchmark.py --only update,api
+"""
+import os
+import sys
+import json
+import time
+import socket
+import random
+import argparse
+import tempfile
+import statistics
+import subprocess
+import logging
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BENCHMARKS = ('update', 'api', 'broadcast', 'tracker')
+
+# Fault injection scenarios for the update benchmark
+SCENARIOS = {
+    'baseline': {},
+    'slow': {'latency': 0.2, 'jitter': 0.1},
+    'flaky': {'failure_rate': 0.3},
+    'solanafn down': {'providers': {'solanafn': {'failure_rate': 1.0}}}
+}
+DEFAULT_FAULTS = {'latency': 0.0, 'jitter': 0.0, 'failure_rate': 0.0, 'failure_status': 503}
+
+def int_list(value):
+    return [int(item) for item in value.split(',')]
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def print_table(title, headers, rows):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    print(f"\n{title}")
+    print('  '.join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    print('  '.join('-' * width for width in widths))
+    for row in rows:
+        print('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+
+def ms(seconds):
+    return f"{seconds * 1000:.1f}"
+
+class ProviderServer:
+    """tools/provider_server.py running in a subprocess"""
+
+    def __init__(self, port):
+        self.url = f"http://localhost:{port}"
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, 'tools', 'provider_server.py'), '--port', str(port)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                requests.get(f"{self.url}/_config", timeout=1)
+                return
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError("Provider stand-in server did not start")
+
+    def configure(self, **config):
+        response = requests.post(f"{self.url}/_config", json=config, timeout=5)
+        response.raise_for_status()
+        return response.json()
+
+    def reset_faults(self):
+        state = requests.get(f"{self.url}/_config", timeout=5).json()
+        providers = {provider: DEFAULT_FAULTS for provider in state['providers']}
+        self.configure(providers=providers, **DEFAULT_FAULTS)
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait()
+
+def point_providers_at(server, workdir):
+    """Environment for app.py and main.py; must be set before importing them"""
+    os.environ.update({
+        'COINGECKO_API_URL': f"{server.url}/coingecko",
+        'BINANCE_API_URL': f"{server.url}/binance",
+        'SOLANAFN_API_URL': f"{server.url}/solanafn",
+        'SOLSCAN_API_URL': f"{server.url}/solscan",
+        'SOLANA_RPC_URL': f"{server.url}/solana",
+        'HISTORY_PATH': os.path.join(workdir, 'history'),
+        'SNAPSHOT_PATH': os.path.join(workdir, 'snapshot.json'),
+        'SOLANA_STATE_PATH': os.path.join(workdir, 'solana_state.json'),
+        'CHECKPOINT_PATH': os.path.join(workdir, 'checkpoint.json'),
+        'TRACKER_CHECKPOINT_PATH': os.path.join(workdir, 'tracker_checkpoint.json'),
+        'ENABLE_ALERTS': 'false'
+    })
+
+def run_update_jobs(app):
+    """One cold-cache pass over every update job, returning seconds per job"""
+    jobs = {
+        'solana': (app.fetch_solana_token_data,),
+        'btc': (app.fetch_btc_data,),
+        'markets': (app.fetch_with_deadline, 'coingecko', app.sync_markets)
+    }
+    timings = {}
+    for name, job in jobs.items():
+        app.provider_cache.clear()
+        start = time.perf_counter()
+        app.run_update_job(name, *job)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+def bench_update(app, server, cycles):
+    results = {}
+    rows = []
+    run_update_jobs(app)  # warm up connections and exchange markets
+    for scenario, faults in SCENARIOS.items():
+        server.reset_faults()
+        server.configure(**faults)
+        samples = {}
+        for _ in range(cycles):
+            for job, seconds in run_update_jobs(app).items():
+                samples.setdefault(job, []).append(seconds)
+        for job, values in samples.items():
+            results[f"{scenario}/{job}"] = {
+                'p50_ms': statistics.median(values) * 1000,
+                'p95_ms': percentile(values, 95) * 1000,
+                'max_ms': max(values) * 1000
+            }
+            rows.append((scenario, job, ms(statistics.median(values)), ms(percentile(values, 95)), ms(max(values))))
+    server.reset_faults()
+    print_table(f"Update cycle latency ({cycles} cold-cache cycles)", ('scenario', 'job', 'p50 ms', 'p95 ms', 'max ms'), rows)
+    return results
+
+def bench_api(app, seconds):
+    client = app.app.test_client()
+    etag = app.current_snapshot.etag
+    variants = {
+        'identity': ('/api/data', {}),
+        'gzip': ('/api/data', {'Accept-Encoding': 'gzip'}),
+        'br': ('/api/data', {'Accept-Encoding': 'br'}),
+        '304': ('/api/data', {'If-None-Match': f'"{etag}"'}),
+        'msgpack': ('/api/data?format=msgpack', {})
+    }
+    results = {}
+    rows = []
+    for name, (url, headers) in variants.items():
+        count = 0
+        size = len(client.get(url, headers=headers).data)
+        deadline = time.perf_counter() + seconds
+        start = time.perf_counter()
+        while time.perf_counter() < deadline:
+            client.get(url, headers=headers)
+            count += 1
+        rate = count / (time.perf_counter() - start)
+        results[name] = {'requests_per_second': rate, 'bytes': size}
+        rows.append((name, f"{rate:.0f}", size))
+    print_table(f"/api/data throughput (in-process, {seconds}s per variant)", ('variant', 'req/s', 'bytes'), rows)
+    return results
+
+def perturb(crypto_data, coins=10):
+    """Nudge prices the way a real update cycle would"""
+    crypto_data['solana_token']['price'] += 0.01
+    crypto_data['btc']['price'] += 0.5
+    for coin in random.sample(crypto_data['top_100'], min(coins, len(crypto_data['top_100']))):
+        coin['current_price'] = round(coin['current_price'] * random.uniform(0.999, 1.001), 8)
+
+def bench_broadcast(app, client_counts, rounds):
+    server = app.socketio.server
+    packets = [0]
+
+    def count_packet(eio_sid, packet):
+        packets[0] += 1
+
+    server._send_eio_packet = count_packet
+    connected = 0
+    results = {}
+    rows = []
+    for count in client_counts:
+        for i in range(connected, count):
+            sid = server.manager.connect(f"bench-{i}", '/')
+            for room in app.DEFAULT_ROOMS:
+                server.manager.enter_room(sid, '/', room)
+        connected = max(connected, count)
+        timings = []
+        packets[0] = 0
+        for _ in range(rounds):
+            perturb(app.crypto_data)
+            start = time.perf_counter()
+            app.broadcast_update()
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        results[count] = {
+            'p50_ms': median * 1000,
+            'p95_ms': percentile(timings, 95) * 1000,
+            'packets_per_broadcast': packets[0] / rounds
+        }
+        rows.append((connected, ms(median), ms(percentile(timings, 95)), f"{median / connected * 1e6:.1f}", packets[0] // rounds))
+    print_table(
+        f"Broadcast cost ({rounds} broadcasts per step, rooms {app.DEFAULT_ROOMS})",
+        ('clients', 'p50 ms', 'p95 ms', 'us/client', 'packets'),
+        rows
+    )
+    return results
+
+def bench_tracker(server, holder_counts, signature_counts, rounds):
+    import main
+    results = {}
+    rows = []
+    for holders in holder_counts:
+        for signatures in signature_counts:
+            # Fresh tracker state each time so the first cycle is a real cold start
+            if os.path.exists(os.environ['SOLANA_STATE_PATH']):
+                os.remove(os.environ['SOLANA_STATE_PATH'])
+            server.configure(holders=holders, signatures=signatures)
+            tracker = main.CryptoAccumulationTracker()
+            start = time.perf_counter()
+            tracker.track_solana()
+            cold = time.perf_counter() - start
+
+            timings = []
+            for _ in range(rounds):
+                server.configure(add_signatures=signatures)
+                start = time.perf_counter()
+                tracker.track_solana()
+                timings.append(time.perf_counter() - start)
+            median = statistics.median(timings)
+            results[f"{holders}/{signatures}"] = {'cold_ms': cold * 1000, 'p50_ms': median * 1000}
+            rows.append((holders, signatures, ms(cold), ms(median), ms(max(timings))))
+    print_table(
+        f"Tracker Solana cycle ({rounds} incremental cycles per row)",
+        ('holders', 'new sigs/cycle', 'cold ms', 'p50 ms', 'max ms'),
+        rows
+    )
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help=f"comma-separated subset of {', '.join(BENCHMARKS)}")
+    parser.add_argument('--cycles', type=int, default=5, help='update cycles per scenario')
+    parser.add_argument('--seconds', type=float, default=2.0, help='duration of each /api/data variant')
+    parser.add_argument('--clients', type=int_list, default=[1, 10, 100, 1000, 10000])
+    parser.add_argument('--rounds', type=int, default=5, help='broadcasts per client count and tracker cycles per row')
+    parser.add_argument('--holders', type=int_list, default=[100, 1000, 10000])
+    parser.add_argument('--signatures', type=int_list, default=[10, 100, 1000])
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    selected = args.only.split(',')
+
+    server = ProviderServer(free_port())
+    workdir = tempfile.mkdtemp(prefix='crypto_tracker_bench_')
+    point_providers_at(server, workdir)
+    try:
+        import app
+        # Benchmarks measure the work, not the per-request log lines
+        logging.getLogger().setLevel(logging.WARNING)
+        app.socketio.server.logger.setLevel(logging.WARNING)
+        app.socketio.server.eio.logger.setLevel(logging.WARNING)
+
+        results = {}
+        if 'update' in selected:
+            results['update'] = bench_update(app, server, args.cycles)
+        else:
+            run_update_jobs(app)  # the other benchmarks need populated data
+        if 'api' in selected:
+            results['api'] = bench_api(app, args.seconds)
+        if 'broadcast' in selected:
+            results['broadcast'] = bench_broadcast(app, args.clients, args.rounds)
+        if 'tracker' in selected:
+            results['tracker'] = bench_tracker(server, args.holders, args.signatures, args.rounds)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2)
+    finally:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
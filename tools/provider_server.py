@@ -0,0 +1,339 @@
+"""Local stand-in for every upstream provider, serving recorded responses.
+
+Serves CoinGecko, Binance, SolanaFN, Solscan and Solana JSON-RPC under one
+port, each under its own path prefix, with injectable latency and failures:
+
+    COINGECKO_API_URL=http://localhost:8900/coingecko
+    BINANCE_API_URL=http://localhost:8900/binance
+    SOLANAFN_API_URL=http://localhost:8900/solanafn
+    SOLSCAN_API_URL=http://localhost:8900/solscan
+    SOLANA_RPC_URL=http://localhost:8900/solana
+
+Static responses come from the fixtures directory (refresh them from the live
+APIs with --record). Solana token accounts and signatures are generated, so
+holder, signature and market coin counts can be scaled. GET or POST /_config reads or
+changes latency, failures and those counts while the server runs.
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+import logging
+
+from aiohttp import web
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'providers')
+PROVIDERS = ('coingecko', 'binance', 'solanafn', 'solscan', 'solana')
+TOKEN_PROGRAM = 'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA'
+SIGNATURE_PAGE_LIMIT = 1000
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+# Live endpoints each fixture is recorded from
+RECORD_SOURCES = {
+    'coingecko_markets.json': 'https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=100',
+    'coingecko_simple_price.json': 'https://api.coingecko.com/api/v3/simple/price?ids=solana,bitcoin&vs_currencies=usd'
+                                   '&include_24hr_change=true&include_24hr_vol=true&include_market_cap=true',
+    'solanafn_price.json': 'https://api.solanafn.com/v1/price',
+    'solscan_chain_stat.json': 'https://public-api.solscan.io/chain/stat',
+    'binance_exchange_info.json': 'https://api.binance.com/api/v3/exchangeInfo?symbols=["BTCUSDT","SOLUSDT","ETHUSDT","BNBUSDT"]',
+    'binance_ticker_24hr.json': 'https://api.binance.com/api/v3/ticker/24hr?symbols=["BTCUSDT","SOLUSDT","ETHUSDT","BNBUSDT"]'
+}
+
+def base58(data):
+    number = int.from_bytes(data, 'big')
+    encoded = ''
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = BASE58_ALPHABET[remainder] + encoded
+    return '1' * (len(data) - len(data.lstrip(b'\0'))) + encoded
+
+def holder_address(i):
+    return base58(hashlib.sha256(f'holder-{i}'.encode()).digest())
+
+def signature(i):
+    return base58(hashlib.sha512(f'signature-{i}'.encode()).digest())
+
+def load_fixtures(path):
+    fixtures = {}
+    for name in os.listdir(path):
+        if name.endswith('.json'):
+            with open(os.path.join(path, name)) as f:
+                fixtures[name[:-len('.json')]] = json.load(f)
+    return fixtures
+
+def record_fixtures(path):
+    """Overwrite the fixtures with fresh responses from the live APIs"""
+    import requests
+    os.makedirs(path, exist_ok=True)
+    for name, url in RECORD_SOURCES.items():
+        try:
+            response = requests.get(url, timeout=10)
+            response.raise_for_status()
+            with open(os.path.join(path, name), 'w') as f:
+                json.dump(response.json(), f, indent=1)
+            logging.info(f"Recorded {name}")
+        except Exception as e:
+            logging.error(f"Error recording {name}: {str(e)}")
+
+class ProviderState:
+    """Fault injection settings plus the generated Solana token state"""
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, failure_status=503, holders=100, signatures=100, coins=1000):
+        self.defaults = {
+            'latency': latency,
+            'jitter': jitter,
+            'failure_rate': failure_rate,
+            'failure_status': failure_status
+        }
+        self.providers = {}
+        self.holders = holders
+        self.coins = coins
+        self.requests = {provider: 0 for provider in PROVIDERS}
+        # Signatures oldest first, so new ones append; positions count from the newest
+        self._signatures = []
+        self._signature_ids = {}
+        self.add_signatures(signatures)
+
+    @property
+    def signature_count(self):
+        return len(self._signatures)
+
+    def add_signatures(self, count):
+        for _ in range(count):
+            sig = signature(len(self._signatures))
+            self._signature_ids[sig] = len(self._signatures)
+            self._signatures.append(sig)
+
+    def signature_at(self, position):
+        """Signature by position, newest first"""
+        return self._signatures[self.signature_count - 1 - position]
+
+    def signature_position(self, sig):
+        sig_id = self._signature_ids.get(sig)
+        return None if sig_id is None else self.signature_count - 1 - sig_id
+
+    def settings(self, provider):
+        return dict(self.defaults, **self.providers.get(provider, {}))
+
+    def configure(self, config):
+        for key in self.defaults:
+            if key in config:
+                self.defaults[key] = config[key]
+        for provider, settings in config.get('providers', {}).items():
+            self.providers.setdefault(provider, {}).update(settings)
+        if 'holders' in config:
+            self.holders = int(config['holders'])
+        if 'coins' in config:
+            self.coins = int(config['coins'])
+        if 'signatures' in config:
+            self._signatures = []
+            self._signature_ids = {}
+            self.add_signatures(int(config['signatures']))
+        self.add_signatures(int(config.get('add_signatures', 0)))
+
+    def describe(self):
+        return {
+            **self.defaults,
+            'providers': self.providers,
+            'holders': self.holders,
+            'coins': self.coins,
+            'signatures': self.signature_count,
+            'requests': self.requests
+        }
+
+@web.middleware
+async def inject_faults(request, handler):
+    provider = request.path.strip('/').split('/')[0]
+    state = request.app['state']
+    if provider in PROVIDERS:
+        state.requests[provider] += 1
+        settings = state.settings(provider)
+        delay = settings['latency'] + random.uniform(0, settings['jitter'])
+        if delay:
+            await asyncio.sleep(delay)
+        if random.random() < settings['failure_rate']:
+            return web.json_response({'error': 'injected failure'}, status=settings['failure_status'])
+    return await handler(request)
+
+def make_app(fixtures, state):
+    def fixture(name):
+        async def handler(request):
+            return web.json_response(fixtures[name])
+        return handler
+
+    async def coingecko_price(request):
+        ids = request.query.get('ids', '').split(',')
+        prices = fixtures['coingecko_simple_price']
+        return web.json_response({coin_id: prices[coin_id] for coin_id in ids if coin_id in prices})
+
+    def market_coin(rank):
+        """Recorded coin for the recorded ranks, generated ones past them"""
+        recorded = fixtures['coingecko_markets']
+        if rank <= len(recorded):
+            return recorded[rank - 1]
+        template = recorded[rank % len(recorded)]
+        last_cap = recorded[-1]['market_cap'] or 1
+        return dict(
+            template,
+            id=f'generated-{rank}',
+            symbol=f'g{rank}',
+            name=f'Generated {rank}',
+            market_cap=int(last_cap * len(recorded) / rank),
+            market_cap_rank=rank,
+            price_change_percentage_24h=round(random.uniform(-10, 10), 3)
+        )
+
+    async def coingecko_markets(request):
+        per_page = int(request.query.get('per_page', 100))
+        page = int(request.query.get('page', 1))
+        first = (page - 1) * per_page + 1
+        last = min(page * per_page, state.coins)
+        return web.json_response([market_coin(rank) for rank in range(first, last + 1)])
+
+    async def binance_exchange_info(request):
+        # Only spot markets are recorded; futures and options report none
+        if request.match_info['api'] == 'api/v3':
+            return web.json_response(fixtures['binance_exchange_info'])
+        return web.json_response({'symbols': []})
+
+    async def binance_ticker(request):
+        tickers = {ticker['symbol']: ticker for ticker in fixtures['binance_ticker_24hr']}
+        if 'symbol' in request.query:
+            ticker = tickers.get(request.query['symbol'])
+            if not ticker:
+                return web.json_response({'code': -1121, 'msg': 'Invalid symbol.'}, status=400)
+            return web.json_response(ticker)
+        if 'symbols' in request.query:
+            symbols = json.loads(request.query['symbols'])
+            return web.json_response([tickers[symbol] for symbol in symbols if symbol in tickers])
+        return web.json_response(list(tickers.values()))
+
+    def rpc_result(method, params):
+        slot = 250_000_000 + state.signature_count
+        if method == 'getTokenAccountsByOwner':
+            return {'context': {'slot': slot}, 'value': [
+                {
+                    'pubkey': holder_address(i),
+                    'account': {
+                        'lamports': 2039280,
+                        'data': ['', 'base64'],
+                        'owner': TOKEN_PROGRAM,
+                        'executable': False,
+                        'rentEpoch': 0,
+                        'space': 165
+                    }
+                }
+                for i in range(state.holders)
+            ]}
+        if method == 'getMultipleAccounts':
+            return {'context': {'slot': slot}, 'value': [
+                {
+                    'lamports': 2039280,
+                    'data': {
+                        'program': 'spl-token',
+                        'parsed': {'type': 'account', 'info': {'tokenAmount': {
+                            'amount': str(1_000_000 * (int(hashlib.md5(address.encode()).hexdigest()[:6], 16) + slot % 1000)),
+                            'decimals': 6
+                        }}},
+                        'space': 165
+                    },
+                    'owner': TOKEN_PROGRAM,
+                    'executable': False,
+                    'rentEpoch': 0
+                }
+                for address in params[0]
+            ]}
+        if method == 'getSignaturesForAddress':
+            config = params[1] if len(params) > 1 and params[1] else {}
+            before = state.signature_position(config.get('before'))
+            until = state.signature_position(config.get('until'))
+            start = before + 1 if before is not None else 0
+            stop = until if until is not None else state.signature_count
+            stop = min(stop, start + config.get('limit', SIGNATURE_PAGE_LIMIT))
+            now = int(time.time())
+            return [
+                {
+                    'signature': state.signature_at(i),
+                    'slot': slot - i,
+                    'err': None,
+                    'memo': None,
+                    'blockTime': now - i,
+                    'confirmationStatus': 'finalized'
+                }
+                for i in range(start, stop)
+            ]
+        if method == 'getTransaction':
+            seed = int(hashlib.md5(params[0].encode()).hexdigest()[:8], 16)
+            return {
+                'slot': slot,
+                'blockTime': int(time.time()),
+                'meta': {'err': None, 'fee': 5000, 'preBalances': [seed], 'postBalances': [seed + seed % 7919 - 3959]},
+                'transaction': {'signatures': [params[0]]}
+            }
+        raise KeyError(method)
+
+    def rpc_response(call):
+        try:
+            return {'jsonrpc': '2.0', 'id': call.get('id'), 'result': rpc_result(call['method'], call.get('params', []))}
+        except KeyError:
+            return {'jsonrpc': '2.0', 'id': call.get('id'), 'error': {'code': -32601, 'message': 'Method not found'}}
+
+    async def solana_rpc(request):
+        payload = await request.json()
+        if isinstance(payload, list):
+            return web.json_response([rpc_response(call) for call in payload])
+        return web.json_response(rpc_response(payload))
+
+    async def get_config(request):
+        return web.json_response(state.describe())
+
+    async def set_config(request):
+        state.configure(await request.json())
+        return web.json_response(state.describe())
+
+    app = web.Application(middlewares=[inject_faults])
+    app['state'] = state
+    app.router.add_get('/solanafn/price', fixture('solanafn_price'))
+    app.router.add_get('/solscan/chain/stat', fixture('solscan_chain_stat'))
+    app.router.add_get('/coingecko/simple/price', coingecko_price)
+    app.router.add_get('/coingecko/coins/markets', coingecko_markets)
+    app.router.add_get('/binance/{api:.+}/exchangeInfo', binance_exchange_info)
+    app.router.add_get('/binance/api/v3/ticker/24hr', binance_ticker)
+    app.router.add_post('/solana', solana_rpc)
+    app.router.add_get('/_config', get_config)
+    app.router.add_post('/_config', set_config)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', default=FIXTURES)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra random seconds')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='fraction of requests that fail')
+    parser.add_argument('--failure-status', type=int, default=503, help='HTTP status of injected failures')
+    parser.add_argument('--holders', type=int, default=100, help='token accounts the Solana RPC reports')
+    parser.add_argument('--signatures', type=int, default=100, help='signatures the Solana RPC starts with')
+    parser.add_argument('--coins', type=int, default=1000, help='coins CoinGecko markets lists, generated past the fixture')
+    parser.add_argument('--record', action='store_true', help='refresh the fixtures from the live APIs and exit')
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.fixtures)
+        return
+    state = ProviderState(
+        args.latency, args.jitter, args.failure_rate, args.failure_status, args.holders, args.signatures, args.coins
+    )
+    web.run_app(make_app(load_fixtures(args.fixtures), state), host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    main()
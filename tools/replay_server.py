@@ -0,0 +1,68 @@
+"""Local websocket server that replays recorded exchange stream frames.
+
+Point the app or tracker at it with BINANCE_WS_URL=ws://localhost:9443.
+
+Each line of the frames file is either a raw frame or
+{"delay": seconds_since_previous_frame, "frame": {...}}.
+"""
+import json
+import asyncio
+import argparse
+import logging
+
+from aiohttp import web
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def load_frames(path):
+    frames = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if 'frame' in entry:
+                frames.append((entry.get('delay', 0), entry['frame']))
+            else:
+                frames.append((0, entry))
+    return frames
+
+def make_app(frames, speed=1.0, loop=False):
+    async def stream(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        logging.info(f"Client connected, replaying {len(frames)} frames")
+        try:
+            while True:
+                for delay, frame in frames:
+                    if delay:
+                        await asyncio.sleep(delay / speed)
+                    await ws.send_str(json.dumps(frame))
+                if not loop:
+                    break
+        except ConnectionResetError:
+            logging.info("Client disconnected")
+        await ws.close()
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/stream', stream)
+    app.router.add_get('/ws/{streams}', stream)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', default='tools/fixtures/binance_ticker.jsonl')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=9443)
+    parser.add_argument('--speed', type=float, default=1.0, help='playback speed multiplier')
+    parser.add_argument('--loop', action='store_true', help='replay the frames forever')
+    args = parser.parse_args()
+
+    web.run_app(make_app(load_frames(args.frames), args.speed, args.loop), host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    main()